@@ -4,6 +4,8 @@ from flask_cors import CORS
 from utils.gemini_handler import GeminiHandler
 from utils.twilio_handler import TwilioHandler
 from database.chromadb_manager import ChromaDBManager
+from database.async_chromadb_manager import AsyncChromaDBManager
+from database.incremental_indexer import IncrementalIndexer
 from services.health_tips import HealthTipsService
 from config import Config
 import os
@@ -18,10 +20,40 @@ config = Config()
 # Initialize handlers
 gemini_handler = GeminiHandler(config)
 twilio_handler = TwilioHandler()
-db_manager = ChromaDBManager(config.CHROMA_DB_PATH)
+db_manager = ChromaDBManager(
+    config.CHROMA_DB_PATH,
+    embedding_cache_size=config.EMBEDDING_CACHE_SIZE,
+    embedding_cache_ttl=config.EMBEDDING_CACHE_TTL,
+    embedding_cache_path=config.EMBEDDING_CACHE_PATH,
+    use_memory_index=config.USE_MEMORY_INDEX,
+    write_behind=config.WRITE_BEHIND_ENABLED,
+    write_behind_batch_size=config.WRITE_BEHIND_BATCH_SIZE,
+    write_behind_flush_interval=config.WRITE_BEHIND_FLUSH_INTERVAL,
+    write_behind_max_queue=config.WRITE_BEHIND_MAX_QUEUE,
+    chat_retention_months=config.CHAT_HISTORY_RETENTION_MONTHS,
+    retrieval_mode=config.RETRIEVAL_MODE,
+    quantized_index=config.QUANTIZED_INDEX,
+    quantized_nlist=config.QUANTIZED_INDEX_NLIST,
+    quantized_nprobe=config.QUANTIZED_INDEX_NPROBE,
+    quantized_rescore_factor=config.QUANTIZED_RESCORE_FACTOR,
+    embedding_store_path=config.EMBEDDING_STORE_PATH,
+    client_mode=config.CHROMA_MODE,
+    server_host=config.CHROMA_SERVER_HOST,
+    server_port=config.CHROMA_SERVER_PORT,
+    http_pool_size=config.CHROMA_HTTP_POOL_SIZE
+)
+if config.KNOWLEDGE_WATCH_ENABLED:
+    # Apply catalog edits live; only changed records are embedded
+    catalog_indexer = IncrementalIndexer(db_manager, config.KNOWLEDGE_DATA_DIR)
+    catalog_indexer.start_watching(interval=config.KNOWLEDGE_WATCH_INTERVAL)
+# Async facade so the async routes never block their event loop on database calls
+async_db_manager = AsyncChromaDBManager(db_manager, max_concurrency=config.DB_MAX_CONCURRENCY)
+if config.DB_WARM_UP_ON_START:
+    # Serve immediately; collections and the embedding model load in the background
+    db_manager.warm_up(background=True)
 
 # Initialize services
-gemini_handler.set_managers(db_manager)
+gemini_handler.set_managers(db_manager, async_db_manager)
 health_tips_service = HealthTipsService(db_manager)
 
 @app.errorhandler(404)
@@ -43,7 +75,8 @@ def health_check():
             "whatsapp": config.WHATSAPP_ENABLED,
             "tips": True,
             "feedback": True
-        }
+        },
+        "caches": gemini_handler.cache_stats()
     })
 
 @app.route('/chat', methods=['POST'])
@@ -64,8 +97,8 @@ async def chat():
             is_whatsapp=False
         )
         
-        # Store chat history
-        db_manager.store_chat(user_id, message, response)
+        # Store chat history (queued for a batched background write)
+        await async_db_manager.store_chat(user_id, message, response)
         
         return jsonify({
             "response": response,
@@ -233,7 +266,7 @@ Endpoint Details:
    - Handles chat messages
    - User identification
    - Response generation
-   - Chat history storage
+   - Chat history storage (write-behind, off the response path)
 
 3. /whatsapp/webhook (POST):
    - WhatsApp message processing
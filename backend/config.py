@@ -15,14 +15,88 @@ class Config:
     
     # Database Configuration
     CHROMA_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'chromadb')
+    CHROMA_MODE = os.getenv('CHROMA_MODE', 'persistent')  # persistent (embedded) or http (shared server)
+    CHROMA_SERVER_HOST = os.getenv('CHROMA_SERVER_HOST', 'localhost')
+    CHROMA_SERVER_PORT = int(os.getenv('CHROMA_SERVER_PORT', 8000))
+    CHROMA_HTTP_POOL_SIZE = 32  # pooled HTTP connections per process
+    DB_MAX_CONCURRENCY = 32  # concurrent async database calls per process
+    
+    # Embedding Cache Configuration
+    EMBEDDING_CACHE_SIZE = int(os.getenv('EMBEDDING_CACHE_SIZE', 10000))
+    EMBEDDING_CACHE_TTL = 86400  # 1 day in seconds
+    EMBEDDING_CACHE_PATH = os.getenv('EMBEDDING_CACHE_PATH')  # Optional .npz file, unset = memory only
+    
+    # Serve health_tips/products top-k from an in-process NumPy mirror
+    USE_MEMORY_INDEX = os.getenv('USE_MEMORY_INDEX', 'false').lower() == 'true'
+    
+    # Versioned memory-mapped catalog embeddings shared by all worker processes (unset = off)
+    EMBEDDING_STORE_PATH = os.getenv('EMBEDDING_STORE_PATH')
+    
+    # Compressed product index: unset (off), "sq8" (~4x smaller) or "pq" (~15x smaller)
+    QUANTIZED_INDEX = os.getenv('QUANTIZED_INDEX') or None
+    QUANTIZED_INDEX_NLIST = int(os.getenv('QUANTIZED_INDEX_NLIST', 256))  # IVF lists, 0 = flat scan
+    QUANTIZED_INDEX_NPROBE = 16
+    QUANTIZED_RESCORE_FACTOR = 20  # candidates re-scored exactly per requested result
+    
+    # Retrieval for RAG context: vector, lexical (BM25) or hybrid (both, rank-fused)
+    RETRIEVAL_MODE = os.getenv('RETRIEVAL_MODE', 'hybrid').lower()
+    
+    # Open collections and load the embedding model in a background thread at startup
+    DB_WARM_UP_ON_START = os.getenv('DB_WARM_UP_ON_START', 'true').lower() == 'true'
+    
+    # Write-Behind Configuration (chat history / feedback storage)
+    WRITE_BEHIND_ENABLED = os.getenv('WRITE_BEHIND_ENABLED', 'true').lower() == 'true'
+    WRITE_BEHIND_BATCH_SIZE = 64
+    WRITE_BEHIND_FLUSH_INTERVAL = 1.0  # seconds
+    WRITE_BEHIND_MAX_QUEUE = 10000
+    
+    # Live catalog updates: poll data/health_knowledge and index only changed records
+    KNOWLEDGE_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'health_knowledge')
+    KNOWLEDGE_WATCH_ENABLED = os.getenv('KNOWLEDGE_WATCH_ENABLED', 'false').lower() == 'true'
+    KNOWLEDGE_WATCH_INTERVAL = 5.0  # seconds between catalog file checks
     
     # Model Configuration
     GEMINI_FLASH_MODEL = "gemini-1.5-flash"
     GEMINI_PRO_MODEL = "gemini-1.5-pro"
     SONAR_MODEL = "llama-3.1-sonar-small-128k-online"
     
+    # Response generation per channel: two_pass (reasoning + answer calls) or single_pass (one call)
+    RESPONSE_MODE_WEB = os.getenv('RESPONSE_MODE_WEB', 'two_pass')
+    RESPONSE_MODE_WHATSAPP = os.getenv('RESPONSE_MODE_WHATSAPP', 'single_pass')
+    
+    # Local needs-research classifier: skips the Flash decomposition call when confident
+    RESEARCH_CLASSIFIER_ENABLED = os.getenv('RESEARCH_CLASSIFIER_ENABLED', 'true').lower() == 'true'
+    RESEARCH_CLASSIFIER_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'research_classifier.npz')
+    RESEARCH_LOG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'decomposer_log.ndjson')
+    RESEARCH_CLASSIFIER_THRESHOLD = float(os.getenv('RESEARCH_CLASSIFIER_THRESHOLD', 0.85))
+    RESEARCH_CLASSIFIER_MIN_EXAMPLES = 200  # logged LLM decisions needed before training
+    
+    # Semantic decomposition cache: near-duplicate queries reuse sub-queries
+    DECOMPOSITION_CACHE_ENABLED = os.getenv('DECOMPOSITION_CACHE_ENABLED', 'true').lower() == 'true'
+    DECOMPOSITION_CACHE_THRESHOLD = float(os.getenv('DECOMPOSITION_CACHE_THRESHOLD', 0.9))  # cosine similarity
+    DECOMPOSITION_CACHE_TTL = 604800  # 7 days in seconds
+    DECOMPOSITION_CACHE_SIZE = 5000
+    
+    # Semantic answer cache for non-personalized responses, invalidated by catalog changes
+    ANSWER_CACHE_ENABLED = os.getenv('ANSWER_CACHE_ENABLED', 'true').lower() == 'true'
+    ANSWER_CACHE_THRESHOLD = float(os.getenv('ANSWER_CACHE_THRESHOLD', 0.95))  # stricter than decompositions
+    ANSWER_CACHE_TTL = int(os.getenv('ANSWER_CACHE_TTL', 86400))  # 1 day in seconds
+    ANSWER_CACHE_SIZE = 2000
+    
+    # Persistent Sonar research cache (SQLite), served stale while refreshing in the background
+    RESEARCH_CACHE_ENABLED = os.getenv('RESEARCH_CACHE_ENABLED', 'true').lower() == 'true'
+    RESEARCH_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'research_cache.sqlite3')
+    RESEARCH_CACHE_TTL = int(os.getenv('RESEARCH_CACHE_TTL', 604800))  # 7 days fresh
+    RESEARCH_CACHE_STALE_TTL = int(os.getenv('RESEARCH_CACHE_STALE_TTL', 2592000))  # then 30 days stale
+    RESEARCH_CACHE_MAX_ENTRIES = 20000
+    
+    # User Profile Cache Configuration
+    PROFILE_CACHE_SIZE = 10000
+    PROFILE_TOUCH_INTERVAL = 300  # seconds between timestamp-only profile writes
+    
     # Chat Configuration
     MAX_CHAT_HISTORY = 10
+    CHAT_HISTORY_RETENTION_MONTHS = int(os.getenv('CHAT_HISTORY_RETENTION_MONTHS', 12))  # 0 = keep forever
     MAX_SUB_QUERIES = 4
     
     # Response Configuration
@@ -57,15 +131,31 @@ Configuration Categories:
 2. Database Settings:
    - ChromaDB path configuration
    - Persistent storage location
+   - Embedded or client/server Chroma mode, HTTP pool and async concurrency
    - Database structure settings
+   - Embedding cache size, TTL and optional persistence file
+   - In-memory catalog index toggle
+   - Shared memory-mapped embedding store location
+   - Quantized (sq8 / pq) product index for large catalogs
+   - Retrieval mode (vector / lexical / hybrid)
+   - Background database warm-up toggle
+   - Write-behind batching for chat history and feedback
+   - Incremental catalog indexing (watch data/health_knowledge)
 
 3. Model Configuration:
    - Gemini Flash (fast queries)
    - Gemini Pro (detailed responses)
    - Sonar Model (research queries)
+   - Response mode per channel (two_pass / single_pass)
+   - Local needs-research classifier (threshold, model and decision log paths)
+   - Semantic decomposition cache (similarity threshold, TTL, size)
+   - Semantic answer cache (similarity threshold, TTL, size)
+   - Research cache (path, fresh TTL, stale window, size)
 
 4. Chat Settings:
+   - User profile cache size and write interval
    - Maximum chat history
+   - Chat history retention (monthly partitions)
    - Maximum sub-queries
    - Response limitations
 
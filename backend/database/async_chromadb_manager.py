@@ -0,0 +1,114 @@
+# backend/database/async_chromadb_manager.py
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+
+class AsyncChromaDBManager:
+    def __init__(self, db_manager, max_concurrency: int = 32):
+        self.db_manager = db_manager
+        # Bounded worker pool shared by every event loop (Flask runs one loop per async request);
+        # with an HTTP client the pooled connections are shared by these threads
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="chromadb-async")
+
+    async def _run(self, method, *args, **kwargs):
+        """Run a blocking manager call off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(method, *args, **kwargs))
+
+    async def get_user_profile(self, user_id: str) -> Optional[Dict]:
+        return await self._run(self.db_manager.get_user_profile, user_id)
+
+    async def store_user_profile(self, user_id: str, profile: Dict, exists: bool = False) -> bool:
+        return await self._run(self.db_manager.store_user_profile, user_id, profile, exists=exists)
+
+    async def search_collections(
+        self,
+        query: str,
+        collection_names: List[str],
+        limit: int = 5,
+        where: Optional[Dict] = None,
+        retrieval_mode: Optional[str] = None
+    ) -> Dict[str, Dict]:
+        return await self._run(
+            self.db_manager.search_collections,
+            query, collection_names, limit=limit, where=where, retrieval_mode=retrieval_mode
+        )
+
+    async def get_relevant_content(
+        self,
+        query: str,
+        user_profile: Optional[Dict] = None,
+        limit: int = 5,
+        retrieval_mode: Optional[str] = None
+    ) -> Dict:
+        return await self._run(
+            self.db_manager.get_relevant_content,
+            query, user_profile=user_profile, limit=limit, retrieval_mode=retrieval_mode
+        )
+
+    async def get_health_tips(self, category: Optional[str] = None, limit: int = 5) -> Dict:
+        return await self._run(self.db_manager.get_health_tips, category=category, limit=limit)
+
+    async def get_products_by_category(self, category: str, limit: int = 5) -> Dict:
+        return await self._run(self.db_manager.get_products_by_category, category, limit=limit)
+
+    async def store_chat(self, user_id: str, message: str, response: str) -> bool:
+        return await self._run(self.db_manager.store_chat, user_id, message, response)
+
+    async def store_feedback(self, user_id: str, rating: int, comment: str) -> bool:
+        return await self._run(self.db_manager.store_feedback, user_id, rating, comment)
+
+    async def get_chat_history(self, user_id: str, limit: int = 10, before: Optional[str] = None) -> Dict:
+        return await self._run(self.db_manager.get_chat_history, user_id, limit=limit, before=before)
+
+    async def upsert_records(
+        self,
+        name: str,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict],
+        embeddings: Optional[List] = None
+    ) -> bool:
+        return await self._run(self.db_manager.upsert_records, name, ids, documents, metadatas, embeddings=embeddings)
+
+    async def count(self, name: str, field_value: Optional[str] = None) -> int:
+        return await self._run(self.db_manager.count, name, field_value)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+
+"""
+AsyncChromaDBManager: Non-Blocking Facade Over ChromaDBManager
+
+Chroma's Python clients are synchronous, and the async Flask routes
+(chat, WhatsApp webhook) would otherwise block their event loop on every
+embedding, query and write. This class exposes the ChromaDBManager API
+as coroutines that run on a bounded thread pool.
+
+Key Features:
+1. Same API:
+   - get_user_profile / store_user_profile
+   - search_collections / get_relevant_content
+   - get_health_tips / get_products_by_category
+   - store_chat / store_feedback / get_chat_history
+   - upsert_records / count
+
+2. Bounded Concurrency:
+   - At most max_concurrency manager calls in flight per process
+   - Works across event loops (Flask creates one per async request)
+
+3. Client/Server Mode:
+   - With ChromaDBManager(client_mode="http") every call goes through one
+     pooled HTTP client (connection limits sized to the pool), so app nodes
+     share a single Chroma server instead of an embedded SQLite file
+
+Usage Example:
+db_manager = ChromaDBManager(path, client_mode="http", server_host="chroma", server_port=8000)
+async_db = AsyncChromaDBManager(db_manager, max_concurrency=32)
+history = await async_db.get_chat_history("user123")
+"""
@@ -0,0 +1,121 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Allow running as `python benchmark_index.py` from this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.quantized_index import QuantizedVectorIndex
+from database.vector_index import InMemoryVectorIndex
+
+def synthetic_embeddings(count: int, dimension: int, clusters: int = 200, seed: int = 0):
+    """Unit vectors around random topic centers, roughly like sentence embeddings of a catalog"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dimension)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, size=count)] + 0.6 * rng.standard_normal((count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def load_collection_embeddings(persist_dir: str, name: str):
+    import chromadb
+    collection = chromadb.PersistentClient(path=persist_dir).get_collection(name)
+    results = collection.get(include=["embeddings"])
+    return results['ids'], np.asarray(results['embeddings'], dtype=np.float32)
+
+def rescore(vectors: np.ndarray, row_of: dict, query: np.ndarray, candidate_ids, k: int):
+    """Exact re-ranking of approximate candidates (ChromaDBManager fetches these from Chroma)"""
+    rows = np.array([row_of[record_id] for record_id in candidate_ids], dtype=np.int64)
+    distances = ((vectors[rows] - query) ** 2).sum(axis=1)
+    return [candidate_ids[i] for i in np.argsort(distances, kind='stable')[:k]]
+
+def benchmark(ids, vectors, queries, k: int, rescore_factor: int, configs):
+    exact = InMemoryVectorIndex("exact")
+    exact.build(ids, vectors, [""] * len(ids), [{}] * len(ids))
+    started = time.perf_counter()
+    truth = [set(exact.search(query, limit=k)['ids']) for query in queries]
+    exact_ms = (time.perf_counter() - started) * 1000 / len(queries)
+    exact_bytes = exact.nbytes / len(ids)
+    row_of = {record_id: i for i, record_id in enumerate(ids)}
+
+    print(f"{len(ids)} vectors x {vectors.shape[1]} dims, {len(queries)} queries, recall@{k}, rescoring {rescore_factor * k} candidates")
+    print(f"{'index':<28}{'bytes/vec':>10}{'x smaller':>10}{'build s':>9}{'ms/query':>10}{'recall':>8}")
+    print(f"{'float32 exact':<28}{exact_bytes:>10.1f}{1.0:>10.1f}{0.0:>9.2f}{exact_ms:>10.2f}{1.0:>8.3f}")
+
+    for label, kwargs in configs:
+        index = QuantizedVectorIndex("benchmark", **kwargs)
+        started = time.perf_counter()
+        index.build(ids, vectors)
+        build_seconds = time.perf_counter() - started
+
+        hits = 0
+        started = time.perf_counter()
+        for query, expected in zip(queries, truth):
+            candidates = index.search(query, limit=k * rescore_factor)['ids']
+            hits += len(expected & set(rescore(vectors, row_of, query, candidates, k)))
+        query_ms = (time.perf_counter() - started) * 1000 / len(queries)
+        recall = hits / (k * len(queries))
+        print(
+            f"{label:<28}{index.bytes_per_vector:>10.1f}{exact_bytes / index.bytes_per_vector:>10.1f}"
+            f"{build_seconds:>9.2f}{query_ms:>10.2f}{recall:>8.3f}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recall@k vs memory/latency of the quantized product index")
+    parser.add_argument('--persist-dir', default=None, help="Benchmark a real ChromaDB directory instead of synthetic data")
+    parser.add_argument('--collection', default="products")
+    parser.add_argument('--count', type=int, default=100000, help="Synthetic vectors")
+    parser.add_argument('--dimension', type=int, default=384, help="Synthetic dimension (MiniLM = 384)")
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--rescore-factor', type=int, default=20)
+    parser.add_argument('--nlist', type=int, default=256)
+    parser.add_argument('--nprobe', type=int, default=16)
+    parser.add_argument('--pq-subvectors', type=int, default=96)
+    args = parser.parse_args()
+
+    if args.persist_dir:
+        ids, vectors = load_collection_embeddings(args.persist_dir, args.collection)
+    else:
+        vectors = synthetic_embeddings(args.count, args.dimension)
+        ids = [f"prod{i}" for i in range(len(vectors))]
+
+    # Held-out queries: perturbed catalog vectors
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.integers(0, len(vectors), size=args.queries)]
+    queries = queries + 0.3 * rng.standard_normal(queries.shape).astype(np.float32) / np.sqrt(vectors.shape[1])
+
+    benchmark(ids, vectors, queries, args.k, args.rescore_factor, [
+        ("sq8 flat", {"method": "sq8"}),
+        (f"sq8 ivf{args.nlist}/{args.nprobe}", {"method": "sq8", "nlist": args.nlist, "nprobe": args.nprobe}),
+        (f"pq{args.pq_subvectors} flat", {"method": "pq", "pq_subvectors": args.pq_subvectors}),
+        (f"pq{args.pq_subvectors} ivf{args.nlist}/{args.nprobe}", {
+            "method": "pq", "pq_subvectors": args.pq_subvectors, "nlist": args.nlist, "nprobe": args.nprobe
+        }),
+    ])
+
+
+
+"""
+Quantized Index Benchmark for Health Chatbot
+
+Measures what the compressed product index (QuantizedVectorIndex) trades
+for its memory savings: recall@k after exact re-scoring, bytes per vector
+and per-query latency, against exact float32 search (InMemoryVectorIndex).
+
+Data:
+- Synthetic clustered unit vectors (default 100k x 384, MiniLM-sized)
+- Or a real collection: --persist-dir data/chromadb --collection products
+
+Configurations:
+- sq8 flat / sq8 + IVF
+- pq flat / pq + IVF
+
+Each query retrieves rescore_factor x k approximate candidates, re-ranks
+them with their full float32 vectors (as ChromaDBManager does) and is
+compared with the exact top-k.
+
+Usage:
+python benchmark_index.py [--count 300000] [--k 5] [--rescore-factor 20] [--nlist 256] [--nprobe 16]
+"""
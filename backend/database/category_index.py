@@ -0,0 +1,103 @@
+# backend/database/category_index.py
+from typing import Dict, List, Optional, Tuple
+
+
+class CategoryIndex:
+    def __init__(self, field: str = "category"):
+        self.field = field
+        # category -> {record_id: (document, metadata)}
+        self._by_category: Dict[str, Dict[str, Tuple[str, Dict]]] = {}
+        # record_id -> category
+        self._categories: Dict[str, str] = {}
+        # category -> cached ordered list, invalidated on change
+        self._ordered: Dict[str, List[Tuple[str, Dict]]] = {}
+
+    def add(self, ids: List[str], documents: Optional[List[Optional[str]]], metadatas: List[Optional[Dict]]):
+        """Insert or replace records; a None document keeps the previously indexed text"""
+        documents = documents or [None] * len(ids)
+        for record_id, document, metadata in zip(ids, documents, metadatas):
+            metadata = metadata or {}
+            previous = self._lookup(record_id)
+            if document is None and previous is not None:
+                document = previous[0]
+            self.remove([record_id])
+
+            category = metadata.get(self.field)
+            if category is None:
+                continue
+            self._by_category.setdefault(category, {})[record_id] = (document or "", metadata)
+            self._categories[record_id] = category
+            self._ordered.pop(category, None)
+
+    def remove(self, ids: List[str]):
+        for record_id in ids:
+            category = self._categories.pop(record_id, None)
+            if category is None:
+                continue
+            records = self._by_category.get(category, {})
+            records.pop(record_id, None)
+            if not records:
+                self._by_category.pop(category, None)
+            self._ordered.pop(category, None)
+
+    def _lookup(self, record_id: str) -> Optional[Tuple[str, Dict]]:
+        category = self._categories.get(record_id)
+        if category is None:
+            return None
+        return self._by_category[category].get(record_id)
+
+    def get(self, category: str, limit: Optional[int] = None) -> Dict:
+        """Records in a category ordered by name (then id)"""
+        ordered = self._ordered.get(category)
+        if ordered is None:
+            records = self._by_category.get(category, {})
+            ordered = [
+                records[record_id] for record_id in sorted(
+                    records,
+                    key=lambda record_id: (str(records[record_id][1].get("name", "")), record_id)
+                )
+            ]
+            self._ordered[category] = ordered
+
+        page = ordered if limit is None else ordered[:limit]
+        return {
+            'documents': [document for document, _ in page],
+            'metadatas': [metadata for _, metadata in page]
+        }
+
+    def categories(self) -> List[str]:
+        return sorted(self._by_category)
+
+
+
+"""
+CategoryIndex: In-Memory Category Lookup for Catalog Collections
+
+This class maps each category to its records so category listings
+(get_products_by_category) are dictionary lookups instead of a vector query
+with an empty query string and a where filter.
+
+Key Features:
+1. Structure:
+   - category -> {record_id: (document, metadata)}
+   - record_id -> category, so a record moving category is handled on update
+
+2. Ordering:
+   - Records ordered by metadata name, then id
+   - Ordered lists cached per category, invalidated when the category changes
+
+3. Maintenance:
+   - Built from the products collection on first use (or warm-up)
+   - ChromaDBManager applies every product add/upsert/update/delete
+
+Output Format (same as the other ChromaDBManager read methods):
+{
+    'documents': [...],
+    'metadatas': [...]
+}
+
+Usage Example:
+index = CategoryIndex()
+index.add(ids, documents, metadatas)
+sleep_products = index.get("sleep", limit=5)
+"""
@@ -1,50 +1,821 @@
 import chromadb
+from chromadb.config import Settings
 from chromadb.utils import embedding_functions
+from database.embedding_cache import CachedEmbeddingFunction
+from database.vector_index import InMemoryVectorIndex
+from database.write_behind import WriteBehindQueue
+from database.history_index import ChatHistoryIndex
+from database.profile_codec import decode_profile, encode_profile
+from database.category_index import CategoryIndex
+from database.lexical_index import BM25Index, reciprocal_rank_fusion
+from database.quantized_index import QuantizedVectorIndex
+from database.embedding_store import EmbeddingStore, MappedEmbeddings
+from database.snapshot import read_snapshot, write_snapshot
+import atexit
+import hashlib
 import os
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Dict, List, Optional
 
+import numpy as np
+
 class ChromaDBManager:
-    def __init__(self, persist_directory: str):
+    # Metadata fields whose per-value counts are maintained for sizing filtered queries
+    COUNTED_FIELDS = {
+        "health_tips": "category",
+        "products": "category",
+        "faqs": "category",
+        "chat_history": "user_id",
+    }
+    # Small, rarely-changing catalogs that can be mirrored in memory
+    MEMORY_INDEXED = ("health_tips", "products", "faqs")
+
+    # Large catalogs that can be served from a compressed (quantized) index
+    QUANTIZED_INDEXED = ("products",)
+    # Page size when reading all embeddings of a collection (quantized index, exports)
+    EMBEDDING_PAGE_SIZE = 5000
+
+    # Chat history lives in monthly partitions: chat_history_YYYYMM
+    CHAT_PARTITION_PREFIX = "chat_history_"
+    COLLECTION_NAMES = ("health_tips", "products", "faqs", "feedback", "user_profiles")
+
+    # vector: embeddings only; lexical: BM25 only; hybrid: both fused by reciprocal rank
+    RETRIEVAL_MODES = ("vector", "lexical", "hybrid")
+    # Candidates pulled from each ranking before fusion, as a multiple of the final limit
+    HYBRID_CANDIDATE_FACTOR = 4
+
+    def __init__(
+        self,
+        persist_directory: str,
+        embedding_cache_size: int = 10000,
+        embedding_cache_ttl: Optional[float] = 86400,
+        embedding_cache_path: Optional[str] = None,
+        use_memory_index: bool = False,
+        write_behind: bool = False,
+        write_behind_batch_size: int = 64,
+        write_behind_flush_interval: float = 1.0,
+        write_behind_max_queue: int = 10000,
+        chat_retention_months: Optional[int] = None,
+        retrieval_mode: str = "vector",
+        quantized_index: Optional[str] = None,
+        quantized_nlist: int = 0,
+        quantized_nprobe: int = 16,
+        quantized_rescore_factor: int = 20,
+        embedding_store_path: Optional[str] = None,
+        client_mode: str = "persistent",
+        server_host: str = "localhost",
+        server_port: int = 8000,
+        http_pool_size: int = 32
+    ):
         self.persist_directory = persist_directory
+        self.startup_timings: Dict[str, float] = {}
         # Ensure directory exists
         os.makedirs(persist_directory, exist_ok=True)
         
-        # Initialize embedding function
-        self.embedding_function = embedding_functions.DefaultEmbeddingFunction()
+        # Embedding function behind a shared LRU/TTL cache; the model is only
+        # imported and loaded on first use (or by warm_up())
+        with self._timed("embedding_cache"):
+            self.embedding_function = CachedEmbeddingFunction(
+                factory=embedding_functions.DefaultEmbeddingFunction,
+                max_size=embedding_cache_size,
+                ttl_seconds=embedding_cache_ttl,
+                persist_path=embedding_cache_path
+            )
+            if embedding_cache_path:
+                atexit.register(self.embedding_function.save)
         
-        self.client = chromadb.PersistentClient(path=persist_directory)
+        with self._timed("client"):
+            if client_mode == "http":
+                # Chroma server shared by every app node; one pooled HTTP client per process
+                self.client = chromadb.HttpClient(
+                    host=server_host,
+                    port=server_port,
+                    settings=Settings(
+                        chroma_http_max_connections=http_pool_size,
+                        chroma_http_max_keepalive_connections=http_pool_size,
+                        anonymized_telemetry=False
+                    )
+                )
+            elif client_mode == "persistent":
+                self.client = chromadb.PersistentClient(path=persist_directory)
+            else:
+                raise ValueError(f"Unknown Chroma client mode: {client_mode}")
+        # Other nodes write to a shared store, so per-user state is read from the server
+        self.shared_store = client_mode == "http"
         
-        # Create collections with embedding function
-        self.health_tips = self.client.get_or_create_collection(
-            name="health_tips",
-            embedding_function=self.embedding_function
-        )
-        self.products = self.client.get_or_create_collection(
-            name="products",
-            embedding_function=self.embedding_function
-        )
-        self.chat_history = self.client.get_or_create_collection(
-            name="chat_history",
-            embedding_function=self.embedding_function
-        )
-        self.feedback = self.client.get_or_create_collection(
-            name="feedback",
-            embedding_function=self.embedding_function
-        )
-        self.user_profiles = self.client.get_or_create_collection(
-            name="user_profiles",
-            embedding_function=self.embedding_function
-        )
+        # Collections are opened on first access
+        self.collections: Dict = {}
+        self._collections_lock = threading.Lock()
+        
+        # Chat history partitions (None until discovered) and how many months to keep
+        self._chat_partitions: Optional[set] = None
+        self._chat_history_indexed = False
+        self.chat_retention_months = chat_retention_months
+
+        # Collection size counters, loaded per collection on first use and kept in sync on every write
+        self._counts_lock = threading.RLock()
+        self._collection_counts: Dict[str, int] = {}
+        self._field_counts: Dict[str, Dict[str, int]] = {}
+        self._counters_loaded = set()
+        self._history_index = ChatHistoryIndex()
+
+        # category -> products lookup, built on first use and kept in sync on writes
+        self._product_categories: Optional[CategoryIndex] = None
+
+        # Optional in-process mirrors of the static catalogs, rebuilt lazily after writes
+        self.use_memory_index = use_memory_index
+        self._memory_indexes: Dict[str, InMemoryVectorIndex] = {}
+        self._stale_indexes = set(self.MEMORY_INDEXED)
+
+        # Optional shared, memory-mapped embedding exports backing those mirrors
+        self.embedding_store = EmbeddingStore(embedding_store_path) if embedding_store_path else None
+        # name -> export version a mirror was built from
+        self._memory_versions: Dict[str, str] = {}
+        # name -> export version current when this process last wrote the collection
+        self._local_writes: Dict[str, Optional[str]] = {}
+        # name -> number of writes applied by this process (part of catalog_fingerprint)
+        self._write_generations: Dict[str, int] = {}
+
+        # BM25 indexes over the catalogs, built on first lexical/hybrid query
+        if retrieval_mode not in self.RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode: {retrieval_mode}")
+        self.retrieval_mode = retrieval_mode
+        self._lexical_indexes: Dict[str, BM25Index] = {}
+
+        # Optional compressed index ("sq8" or "pq") for products; candidates are
+        # re-scored against the float32 embeddings stored in Chroma
+        self.quantized_index = quantized_index
+        self.quantized_nlist = quantized_nlist
+        self.quantized_nprobe = quantized_nprobe
+        self.quantized_rescore_factor = quantized_rescore_factor
+        self._quantized_indexes: Dict[str, QuantizedVectorIndex] = {}
+        self._stale_quantized = set(self.QUANTIZED_INDEXED)
 
         # Initialize with default data
-        self._initialize_default_data()
+        with self._timed("default_data"):
+            self._initialize_default_data()
+
+        # Optional background writer for chat and feedback records
+        self.write_queue = None
+        if write_behind:
+            with self._timed("write_behind"):
+                self.write_queue = WriteBehindQueue(
+                    self,
+                    batch_size=write_behind_batch_size,
+                    flush_interval=write_behind_flush_interval,
+                    max_queue_size=write_behind_max_queue,
+                    spill_path=os.path.join(persist_directory, "write_behind.ndjson")
+                )
+                self.write_queue.start()
+                atexit.register(self.write_queue.close)
+
+        self._log_timings("ChromaDBManager startup")
+
+    @contextmanager
+    def _timed(self, phase: str):
+        """Record how long a startup/warm-up phase took"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.startup_timings[phase] = round((time.perf_counter() - started) * 1000, 1)
+
+    def _log_timings(self, title: str, phases: Optional[List[str]] = None):
+        phases = phases or list(self.startup_timings)
+        breakdown = ", ".join(f"{phase}={self.startup_timings[phase]}ms" for phase in phases if phase in self.startup_timings)
+        total = sum(self.startup_timings.get(phase, 0) for phase in phases)
+        print(f"{title}: {total:.1f}ms ({breakdown})")
+
+    def _collection(self, name: str):
+        """Open a collection on first access"""
+        collection = self.collections.get(name)
+        if collection is None:
+            new_partition = False
+            with self._collections_lock:
+                collection = self.collections.get(name)
+                if collection is None:
+                    collection = self.client.get_or_create_collection(
+                        name=name,
+                        embedding_function=self.embedding_function
+                    )
+                    self.collections[name] = collection
+                    if self._is_chat_partition(name) and self._chat_partitions is not None:
+                        new_partition = name not in self._chat_partitions
+                        self._chat_partitions.add(name)
+            if new_partition:
+                # A new month started: expire old partitions
+                self.prune_chat_history()
+        return collection
+
+    @classmethod
+    def _is_chat_partition(cls, name: str) -> bool:
+        # The unpartitioned legacy collection is read as one more partition
+        return name == "chat_history" or name.startswith(cls.CHAT_PARTITION_PREFIX)
+
+    @classmethod
+    def chat_partition_for(cls, when: datetime) -> str:
+        """Partition (collection) name holding chats from the month of `when`"""
+        return f"{cls.CHAT_PARTITION_PREFIX}{when:%Y%m}"
+
+    @classmethod
+    def _partition_month(cls, name: str) -> Optional[int]:
+        """Months since year 0 for a monthly partition, None for the legacy collection"""
+        suffix = name[len(cls.CHAT_PARTITION_PREFIX):]
+        if not name.startswith(cls.CHAT_PARTITION_PREFIX) or len(suffix) != 6 or not suffix.isdigit():
+            return None
+        return int(suffix[:4]) * 12 + int(suffix[4:]) - 1
+
+    def chat_partitions(self) -> List[str]:
+        """Existing chat history partitions, oldest first"""
+        if self._chat_partitions is None:
+            with self._collections_lock:
+                if self._chat_partitions is None:
+                    names = [
+                        collection if isinstance(collection, str) else collection.name
+                        for collection in self.client.list_collections()
+                    ]
+                    self._chat_partitions = {name for name in names if self._is_chat_partition(name)}
+        return sorted(self._chat_partitions, key=lambda name: (self._partition_month(name) or -1, name))
+
+    def prune_chat_history(self, retention_months: Optional[int] = None, now: Optional[datetime] = None) -> List[str]:
+        """Drop whole monthly partitions older than the retention window"""
+        retention_months = retention_months if retention_months is not None else self.chat_retention_months
+        if not retention_months:
+            return []
+        
+        now = now or datetime.now()
+        oldest_kept = now.year * 12 + now.month - 1 - (retention_months - 1)
+        dropped = []
+        try:
+            for name in self.chat_partitions():
+                month = self._partition_month(name)
+                if month is None or month >= oldest_kept:
+                    continue
+                with self._counts_lock:
+                    self.client.delete_collection(name=name)
+                    with self._collections_lock:
+                        self.collections.pop(name, None)
+                        self._chat_partitions.discard(name)
+                    self._collection_counts.pop(name, None)
+                    self._field_counts.pop(name, None)
+                    self._counters_loaded.discard(name)
+                    self._history_index.remove_partition(name)
+                dropped.append(name)
+            
+            if dropped:
+                print(f"Dropped expired chat history partitions: {', '.join(dropped)}")
+        except Exception as e:
+            print(f"Error pruning chat history: {str(e)}")
+        return dropped
+
+    @property
+    def health_tips(self):
+        return self._collection("health_tips")
+
+    @property
+    def products(self):
+        return self._collection("products")
+
+    @property
+    def faqs(self):
+        return self._collection("faqs")
+
+    @property
+    def chat_history(self):
+        """Partition receiving this month's chats"""
+        return self._collection(self.chat_partition_for(datetime.now()))
+
+    @property
+    def feedback(self):
+        return self._collection("feedback")
+
+    @property
+    def user_profiles(self):
+        return self._collection("user_profiles")
+
+    def warm_up(self, background: bool = True):
+        """Open collections, load counters and the embedding model ahead of the first request"""
+        def run():
+            try:
+                with self._timed("warmup_collections"):
+                    for name in self.COLLECTION_NAMES:
+                        self._collection(name)
+                    self.prune_chat_history()
+                with self._timed("warmup_counters"):
+                    for name in self.COLLECTION_NAMES:
+                        self._ensure_counters(name)
+                    self._ensure_chat_history()
+                    self._product_category_index()
+                    if self.retrieval_mode != "vector":
+                        for name in self.MEMORY_INDEXED:
+                            self._lexical_index(name)
+                with self._timed("warmup_model"):
+                    self.embedding_function.embedding_function(["warm up"])
+                self._log_timings(
+                    "ChromaDBManager warm-up",
+                    ["warmup_collections", "warmup_counters", "warmup_model"]
+                )
+            except Exception as e:
+                print(f"Error warming up database: {str(e)}")
+
+        if background:
+            threading.Thread(target=run, name="chromadb-warmup", daemon=True).start()
+        else:
+            run()
+
+    def _ensure_counters(self, name: str):
+        """Load a collection's counters once so queries never need a full scan"""
+        if name in self._counters_loaded:
+            return
+        with self._counts_lock:
+            if name in self._counters_loaded:
+                return
+            try:
+                collection = self._collection(name)
+                self._collection_counts[name] = collection.count()
+
+                field = self._counted_field(name)
+                if field:
+                    counts: Dict[str, int] = {}
+                    results = collection.get(include=["metadatas"])
+                    for metadata in results['metadatas'] or []:
+                        value = (metadata or {}).get(field)
+                        if value is not None:
+                            counts[str(value)] = counts.get(str(value), 0) + 1
+                    self._field_counts[name] = counts
+                    
+                    if self._is_chat_partition(name):
+                        self._history_index.add(results['ids'], results['metadatas'] or [], partition=name)
+
+                self._counters_loaded.add(name)
+
+            except Exception as e:
+                print(f"Error initializing counters for {name}: {str(e)}")
+
+    def _ensure_chat_history(self):
+        """Load counters and the history index for every chat partition once"""
+        if self._chat_history_indexed:
+            return
+        with self._counts_lock:
+            if self._chat_history_indexed:
+                return
+            for partition in self.chat_partitions():
+                self._ensure_counters(partition)
+            self._chat_history_indexed = True
+
+    def _counted_field(self, name: str) -> Optional[str]:
+        if self._is_chat_partition(name):
+            return self.COUNTED_FIELDS["chat_history"]
+        return self.COUNTED_FIELDS.get(name)
+
+    def _apply_count_delta(self, name: str, metadatas: List[Optional[Dict]], delta: int):
+        """Adjust total and per-field counters for added (+1) or removed (-1) records"""
+        self._collection_counts[name] = max(0, self._collection_counts.get(name, 0) + delta * len(metadatas))
+
+        field = self._counted_field(name)
+        if not field:
+            return
+        counts = self._field_counts.setdefault(name, {})
+        for metadata in metadatas:
+            value = (metadata or {}).get(field)
+            if value is None:
+                continue
+            value = str(value)
+            counts[value] = counts.get(value, 0) + delta
+            if counts[value] <= 0:
+                del counts[value]
+
+    def _on_records_changed(
+        self,
+        name: str,
+        added_ids: List[str],
+        added_metadatas: List[Optional[Dict]],
+        removed_ids: List[str],
+        removed_metadatas: List[Optional[Dict]],
+        added_documents: Optional[List[str]] = None
+    ):
+        """Keep counters and derived indexes in sync with a write (caller holds the lock)"""
+        self._stale_indexes.add(name)
+        self._stale_quantized.add(name)
+        self._write_generations[name] = self._write_generations.get(name, 0) + 1
+        if self.embedding_store is not None and name in self.MEMORY_INDEXED:
+            # The export predates this write until a newer version is published
+            self._local_writes[name] = self.embedding_store.current_version(name)
+        
+        if name == "products" and self._product_categories is not None:
+            # Re-added ids are replaced in place so metadata-only updates keep their text
+            readded = set(added_ids)
+            self._product_categories.remove([i for i in removed_ids if i not in readded])
+            self._product_categories.add(added_ids, added_documents, added_metadatas)
+        
+        lexical_index = self._lexical_indexes.get(name)
+        if lexical_index is not None:
+            readded = set(added_ids)
+            lexical_index.remove([i for i in removed_ids if i not in readded])
+            lexical_index.add(added_ids, added_documents, added_metadatas)
+        
+        # Counters not loaded yet will read the post-write state when they are
+        if name not in self._counters_loaded:
+            if self._is_chat_partition(name) and self._chat_history_indexed:
+                # New partition while history is already indexed: load it now
+                self._ensure_counters(name)
+            return
+        
+        self._apply_count_delta(name, removed_metadatas, -1)
+        self._apply_count_delta(name, added_metadatas, 1)
+        
+        if self._is_chat_partition(name):
+            self._history_index.remove(removed_ids)
+            self._history_index.add(added_ids, added_metadatas, partition=name)
+
+    def _add(self, name: str, documents: List[str], metadatas: List[Dict], ids: List[str], **kwargs):
+        """Add records to a collection and update its counters"""
+        with self._counts_lock:
+            self._collection(name).add(documents=documents, metadatas=metadatas, ids=ids, **kwargs)
+            self._on_records_changed(name, ids, metadatas, [], [], added_documents=documents)
+
+    def _upsert(self, name: str, documents: List[str], metadatas: List[Dict], ids: List[str], **kwargs):
+        """Upsert records, counting only ids that did not exist before"""
+        collection = self._collection(name)
+        with self._counts_lock:
+            existing = collection.get(ids=ids, include=["metadatas"])
+            collection.upsert(documents=documents, metadatas=metadatas, ids=ids, **kwargs)
+            self._on_records_changed(
+                name, ids, metadatas, existing['ids'], existing['metadatas'] or [],
+                added_documents=documents
+            )
+
+    def _update(self, name: str, metadatas: List[Dict], ids: List[str]):
+        """Update metadata of existing records (no documents, so nothing is re-embedded)"""
+        collection = self._collection(name)
+        with self._counts_lock:
+            if not self._counted_field(name):
+                # Totals are unchanged by an update
+                collection.update(ids=ids, metadatas=metadatas)
+                self._stale_indexes.add(name)
+                return
+            existing = collection.get(ids=ids, include=["metadatas"])
+            collection.update(ids=ids, metadatas=metadatas)
+            self._on_records_changed(name, ids, metadatas, existing['ids'], existing['metadatas'] or [])
+
+    def _delete(self, name: str, ids: List[str]):
+        """Delete records by id and update counters"""
+        collection = self._collection(name)
+        with self._counts_lock:
+            existing = collection.get(ids=ids, include=["metadatas"])
+            if not existing['ids']:
+                return
+            collection.delete(ids=existing['ids'])
+            self._on_records_changed(name, [], [], existing['ids'], existing['metadatas'] or [])
+
+    def upsert_records(
+        self,
+        name: str,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict],
+        embeddings: Optional[List] = None
+    ) -> bool:
+        """Bulk upsert, optionally with precomputed embeddings (skips re-embedding)"""
+        try:
+            kwargs = {}
+            if embeddings is not None:
+                kwargs['embeddings'] = embeddings
+            self._upsert(name, documents=documents, metadatas=metadatas, ids=ids, **kwargs)
+            return True
+        except Exception as e:
+            print(f"Error upserting records into {name}: {str(e)}")
+            return False
+
+    def delete_records(self, name: str, ids: List[str]) -> bool:
+        """Bulk delete by id (unknown ids are ignored)"""
+        try:
+            if ids:
+                self._delete(name, ids)
+            return True
+        except Exception as e:
+            print(f"Error deleting records from {name}: {str(e)}")
+            return False
+
+    def get_content_hashes(self, name: str, ids: Optional[List[str]] = None) -> Dict[str, Optional[str]]:
+        """Stored content_hash metadata for the given ids, or for every record (missing ids are omitted)"""
+        try:
+            collection = self._collection(name)
+            if ids is not None:
+                results = collection.get(ids=ids, include=["metadatas"])
+                pages = [results]
+            else:
+                pages = []
+                offset = 0
+                while True:
+                    page = collection.get(include=["metadatas"], limit=self.EMBEDDING_PAGE_SIZE, offset=offset)
+                    if not page['ids']:
+                        break
+                    pages.append(page)
+                    offset += len(page['ids'])
+            return {
+                record_id: (metadata or {}).get("content_hash")
+                for page in pages
+                for record_id, metadata in zip(page['ids'], page['metadatas'] or [])
+            }
+        except Exception as e:
+            print(f"Error getting content hashes from {name}: {str(e)}")
+            return {}
+
+    def count(self, name: str, field_value: Optional[str] = None) -> int:
+        """Number of records in a collection, optionally matching its counted field"""
+        if name == "chat_history":
+            # Aggregate over all partitions
+            self._ensure_chat_history()
+            if field_value is not None:
+                return self._history_index.count(str(field_value))
+            return sum(self._collection_counts.get(partition, 0) for partition in self.chat_partitions())
+        
+        self._ensure_counters(name)
+        if field_value is None:
+            return self._collection_counts.get(name, 0)
+        return self._field_counts.get(name, {}).get(str(field_value), 0)
+
+    def _product_category_index(self) -> CategoryIndex:
+        """Category -> products lookup, built from the collection on first use"""
+        if self._product_categories is None:
+            with self._counts_lock:
+                if self._product_categories is None:
+                    index = CategoryIndex()
+                    results = self.products.get(include=["documents", "metadatas"])
+                    index.add(results['ids'], results['documents'], results['metadatas'] or [])
+                    self._product_categories = index
+        return self._product_categories
+
+    def _lexical_index(self, name: str) -> BM25Index:
+        """BM25 index over a collection's documents, built on first use"""
+        if name not in self._lexical_indexes:
+            with self._counts_lock:
+                if name not in self._lexical_indexes:
+                    index = BM25Index(name)
+                    results = self._collection(name).get(include=["documents", "metadatas"])
+                    index.add(results['ids'], results['documents'], results['metadatas'] or [])
+                    self._lexical_indexes[name] = index
+        return self._lexical_indexes[name]
+
+    def _read_embeddings(self, name: str):
+        """All ids and float32 embeddings of a collection, read page by page"""
+        collection = self._collection(name)
+        ids, pages = [], []
+        while True:
+            page = collection.get(include=["embeddings"], limit=self.EMBEDDING_PAGE_SIZE, offset=len(ids))
+            if not page['ids']:
+                break
+            ids.extend(page['ids'])
+            pages.append(np.asarray(page['embeddings'], dtype=np.float32))
+        return ids, np.concatenate(pages) if pages else np.zeros((0, 0), dtype=np.float32)
+
+    def export_snapshot(self, name: str, path: str) -> Optional[Dict]:
+        """Write ids, documents, metadatas and embeddings of a collection to a snapshot file"""
+        try:
+            collection = self._collection(name)
+            ids, documents, metadatas, pages = [], [], [], []
+            while True:
+                page = collection.get(
+                    include=["embeddings", "documents", "metadatas"],
+                    limit=self.EMBEDDING_PAGE_SIZE,
+                    offset=len(ids)
+                )
+                if not page['ids']:
+                    break
+                ids.extend(page['ids'])
+                documents.extend(page['documents'] or [None] * len(page['ids']))
+                metadatas.extend(page['metadatas'] or [None] * len(page['ids']))
+                pages.append(np.asarray(page['embeddings'], dtype=np.float32))
+            
+            manifest = write_snapshot(
+                path, name, ids, documents, metadatas,
+                np.concatenate(pages) if pages else np.zeros((0, 0), dtype=np.float32),
+                embedding_function=self.embedding_function.name()
+            )
+            print(f"Exported snapshot of {name}: {manifest['count']} records to {path}")
+            return manifest
+            
+        except Exception as e:
+            print(f"Error exporting snapshot of {name}: {str(e)}")
+            return None
+
+    def import_snapshot(self, path: str, name: Optional[str] = None, batch_size: int = 1000) -> int:
+        """Bulk-load a snapshot with its stored embeddings (nothing is re-embedded)"""
+        try:
+            snapshot = read_snapshot(path)
+            manifest = snapshot['manifest']
+            if manifest['embedding_function'] != self.embedding_function.name():
+                raise ValueError(
+                    f"Snapshot embedded with {manifest['embedding_function']}, "
+                    f"collection uses {self.embedding_function.name()}"
+                )
+            
+            name = name or manifest['collection']
+            ids, embeddings = snapshot['ids'], snapshot['embeddings']
+            for start in range(0, len(ids), batch_size):
+                end = start + batch_size
+                if not self.upsert_records(
+                    name,
+                    ids[start:end],
+                    snapshot['documents'][start:end],
+                    snapshot['metadatas'][start:end],
+                    embeddings=embeddings[start:end]
+                ):
+                    raise RuntimeError(f"Upsert failed at record {start}")
+            
+            print(f"Imported snapshot into {name}: {len(ids)} records from {path}")
+            return len(ids)
+            
+        except Exception as e:
+            print(f"Error importing snapshot {path}: {str(e)}")
+            return 0
+
+    def _mapped_embeddings(self, name: str) -> Optional[MappedEmbeddings]:
+        """Current shared export of a collection, unless this process has written since"""
+        if self.embedding_store is None:
+            return None
+        mapped = self.embedding_store.open(name)
+        if mapped is None or (name in self._local_writes and self._local_writes[name] == mapped.version):
+            return None
+        self._local_writes.pop(name, None)
+        return mapped
+
+    def export_embeddings(self, names: Optional[List[str]] = None) -> Dict[str, str]:
+        """Publish ids + embeddings of the catalogs to the shared embedding store"""
+        versions = {}
+        if self.embedding_store is None:
+            return versions
+        for name in names or self.MEMORY_INDEXED:
+            try:
+                with self._counts_lock:
+                    ids, embeddings = self._read_embeddings(name)
+                    versions[name] = self.embedding_store.publish(name, ids, embeddings)
+                    self._local_writes.pop(name, None)
+                print(f"Exported {len(ids)} embeddings for {name} ({versions[name]})")
+            except Exception as e:
+                print(f"Error exporting embeddings for {name}: {str(e)}")
+        return versions
+
+    def _memory_index(self, name: str) -> Optional[InMemoryVectorIndex]:
+        """In-memory mirror of a catalog collection, refreshed if the collection changed"""
+        if not self.use_memory_index or name not in self.MEMORY_INDEXED:
+            return None
+        
+        mapped = self._mapped_embeddings(name)
+        if mapped is not None:
+            # Shared export: the matrix stays a read-only mapping, only documents/metadatas are loaded
+            if self._memory_versions.get(name) != mapped.version:
+                ids = mapped.id_list()
+                by_id = {}
+                with self._counts_lock:
+                    self._stale_indexes.discard(name)
+                    for start in range(0, len(ids), self.EMBEDDING_PAGE_SIZE):
+                        records = self._collection(name).get(
+                            ids=ids[start:start + self.EMBEDDING_PAGE_SIZE],
+                            include=["documents", "metadatas"]
+                        )
+                        by_id.update(zip(records['ids'], zip(records['documents'] or [], records['metadatas'] or [])))
+                index = self._memory_indexes.get(name) or InMemoryVectorIndex(name)
+                index.build(
+                    ids,
+                    mapped.embeddings,
+                    [by_id.get(record_id, ("", {}))[0] for record_id in ids],
+                    [by_id.get(record_id, ("", {}))[1] for record_id in ids]
+                )
+                self._memory_indexes[name] = index
+                self._memory_versions[name] = mapped.version
+                print(f"Mapped in-memory index for {name}: {len(index)} vectors ({mapped.version})")
+            return self._memory_indexes[name]
+        
+        if name in self._stale_indexes or name not in self._memory_indexes:
+            with self._counts_lock:
+                self._stale_indexes.discard(name)
+                snapshot = self._collection(name).get(include=["embeddings", "documents", "metadatas"])
+            index = self._memory_indexes.get(name) or InMemoryVectorIndex(name)
+            index.build(
+                snapshot['ids'],
+                snapshot['embeddings'] if snapshot['embeddings'] is not None else [],
+                snapshot['documents'] or [],
+                snapshot['metadatas'] or []
+            )
+            self._memory_indexes[name] = index
+            self._memory_versions.pop(name, None)
+            print(f"Rebuilt in-memory index for {name}: {len(index)} vectors, {index.nbytes} bytes")
+        
+        return self._memory_indexes[name]
+
+    def _quantized_index_for(self, name: str) -> Optional[QuantizedVectorIndex]:
+        """Compressed index of a large catalog, retrained if the collection changed"""
+        if not self.quantized_index or name not in self.QUANTIZED_INDEXED:
+            return None
+        
+        if name in self._stale_quantized or name not in self._quantized_indexes:
+            with self._counts_lock:
+                self._stale_quantized.discard(name)
+                ids, embeddings = self._read_embeddings(name)
+            index = self._quantized_indexes.get(name) or QuantizedVectorIndex(
+                name,
+                method=self.quantized_index,
+                nlist=self.quantized_nlist,
+                nprobe=self.quantized_nprobe
+            )
+            index.build(ids, embeddings)
+            self._quantized_indexes[name] = index
+            print(
+                f"Rebuilt {self.quantized_index} index for {name}: {len(index)} vectors, "
+                f"{index.bytes_per_vector:.1f} bytes/vector"
+            )
+        
+        return self._quantized_indexes[name]
+
+    def _quantized_query(self, name: str, index: QuantizedVectorIndex, query_embedding, n_results: int) -> Dict:
+        """Approximate candidates from the compressed index, re-ranked by exact L2 distance"""
+        candidates = index.search(query_embedding, limit=n_results * self.quantized_rescore_factor)['ids']
+        if not candidates:
+            return {'ids': [], 'documents': [], 'metadatas': []}
+        
+        fetched = self._collection(name).get(ids=candidates, include=["embeddings", "documents", "metadatas"])
+        if not fetched['ids']:
+            return {'ids': [], 'documents': [], 'metadatas': []}
+        query = np.asarray(query_embedding, dtype=np.float32)
+        distances = ((np.asarray(fetched['embeddings'], dtype=np.float32) - query) ** 2).sum(axis=1)
+        top = np.argsort(distances, kind='stable')[:n_results]
+        return {
+            'ids': [fetched['ids'][i] for i in top],
+            'documents': [fetched['documents'][i] for i in top],
+            'metadatas': [fetched['metadatas'][i] for i in top]
+        }
+
+    def _query_collection(
+        self,
+        name: str,
+        query_embedding,
+        n_results: int,
+        where: Optional[Dict] = None,
+        include_ids: bool = False
+    ) -> Dict:
+        """Top-k for one collection, served from the in-memory mirror when enabled"""
+        quantized = self._quantized_index_for(name) if not where else None
+        if quantized is not None:
+            results = self._quantized_query(name, quantized, query_embedding, n_results)
+            if not include_ids:
+                del results['ids']
+            return results
+        
+        index = self._memory_index(name)
+        if index is not None:
+            results = index.search(query_embedding, limit=n_results, where=where)
+            if include_ids:
+                return {'ids': results['ids'], 'documents': results['documents'], 'metadatas': results['metadatas']}
+            return {'documents': results['documents'], 'metadatas': results['metadatas']}
+        
+        query_kwargs = {}
+        if where:
+            query_kwargs['where'] = where
+        results = self._collection(name).query(
+            query_embeddings=[query_embedding],
+            n_results=n_results,
+            **query_kwargs
+        )
+        output = {
+            'documents': results['documents'][0] if results['documents'] else [],
+            'metadatas': results['metadatas'][0] if results['metadatas'] else []
+        }
+        if include_ids:
+            output['ids'] = results['ids'][0] if results['ids'] else []
+        return output
+
+    def _hybrid_query(
+        self,
+        name: str,
+        query: str,
+        query_embedding,
+        n_results: int,
+        where: Optional[Dict] = None
+    ) -> Dict:
+        """Fuse vector and BM25 rankings of one collection with reciprocal-rank fusion"""
+        candidates = min(n_results * self.HYBRID_CANDIDATE_FACTOR, self.count(name))
+        vector = self._query_collection(name, query_embedding, n_results=candidates, where=where, include_ids=True)
+        lexical = self._lexical_index(name).search(query, limit=candidates, where=where)
+        
+        records = dict(zip(lexical['ids'], zip(lexical['documents'], lexical['metadatas'])))
+        records.update(zip(vector['ids'], zip(vector['documents'], vector['metadatas'])))
+        fused = reciprocal_rank_fusion([vector['ids'], lexical['ids']])[:n_results]
+        return {
+            'documents': [records[record_id][0] for record_id, _ in fused],
+            'metadatas': [records[record_id][1] for record_id, _ in fused]
+        }
 
     def _initialize_default_data(self):
         """Initialize collections with default data if empty"""
         try:
             # Initialize default health tips
-            if len(self.health_tips.get()['ids']) == 0:
+            # Cheap count probes; counters are loaded later on demand
+            if self.health_tips.count() == 0:
                 default_tips = [
                     {
                         "id": "tip1",
@@ -64,14 +835,15 @@ class ChromaDBManager:
                 ]
                 
                 for tip in default_tips:
-                    self.health_tips.add(
+                    self._add(
+                        "health_tips",
                         documents=[tip["text"]],
                         metadatas=[{"category": tip["category"]}],
                         ids=[tip["id"]]
                     )
 
             # Initialize default products
-            if len(self.products.get()['ids']) == 0:
+            if self.products.count() == 0:
                 default_products = [
                     {
                         "id": "prod1",
@@ -97,7 +869,8 @@ class ChromaDBManager:
                 ]
                 
                 for product in default_products:
-                    self.products.add(
+                    self._add(
+                        "products",
                         documents=[product["description"]],
                         metadatas=[{
                             "name": product["name"],
@@ -110,33 +883,50 @@ class ChromaDBManager:
         except Exception as e:
             print(f"Error initializing default data: {str(e)}")
 
+    @staticmethod
+    def _profile_id(user_id: str) -> str:
+        return f"profile_{user_id}"
+
     def get_user_profile(self, user_id: str) -> Optional[Dict]:
-        """Get user profile from database"""
+        """Get user profile from database by its primary id"""
         try:
             results = self.user_profiles.get(
-                where={"user_id": user_id},
-                limit=1
+                ids=[self._profile_id(user_id)],
+                include=["metadatas"]
             )
             
             if results and results['metadatas']:
-                return results['metadatas'][0]
+                return decode_profile(results['metadatas'][0])
             return None
             
         except Exception as e:
             print(f"Error getting user profile: {str(e)}")
             return None
 
-    def store_user_profile(self, user_id: str, profile: Dict) -> bool:
-        """Store user profile in database"""
+    def store_user_profile(self, user_id: str, profile: Dict, exists: bool = False) -> bool:
+        """Store user profile in database; existing profiles are updated without re-embedding"""
         try:
+            # Lists and dicts are packed into scalar metadata (topic bitset + blob)
+            metadata = encode_profile(profile)
+            
+            if exists:
+                # Metadata-only update: the profile document never changes
+                self._update(
+                    "user_profiles",
+                    metadatas=[metadata],
+                    ids=[self._profile_id(user_id)]
+                )
+                return True
+            
             # Convert profile to string for document
             profile_str = f"User Profile for {user_id}"
             
             # Store profile
-            self.user_profiles.upsert(
+            self._upsert(
+                "user_profiles",
                 documents=[profile_str],
-                metadatas=[profile],
-                ids=[f"profile_{user_id}"]
+                metadatas=[metadata],
+                ids=[self._profile_id(user_id)]
             )
             return True
             
@@ -144,8 +934,61 @@ class ChromaDBManager:
             print(f"Error storing user profile: {str(e)}")
             return False
 
-    def get_relevant_content(self, query: str, user_profile: Optional[Dict] = None, limit: int = 5) -> Dict:
-        """Get relevant content based on query using vector similarity"""
+    def search_collections(
+        self,
+        query: str,
+        collection_names: List[str],
+        limit: int = 5,
+        where: Optional[Dict] = None,
+        retrieval_mode: Optional[str] = None
+    ) -> Dict[str, Dict]:
+        """Embed the query once and search several collections (vector, lexical or hybrid)"""
+        mode = retrieval_mode or self.retrieval_mode
+        if mode not in self.RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode: {mode}")
+        results = {name: {'documents': [], 'metadatas': []} for name in collection_names}
+        
+        searchable = [name for name in collection_names if self.count(name)]
+        if not searchable:
+            return results
+        
+        # Lexical search needs no embedding at all
+        query_embedding = self.embedding_function([query])[0] if mode != "lexical" else None
+        
+        for name in searchable:
+            try:
+                n_results = min(limit, self.count(name))
+                if mode == "vector":
+                    results[name] = self._query_collection(name, query_embedding, n_results=n_results, where=where)
+                elif mode == "lexical":
+                    lexical = self._lexical_index(name).search(query, limit=n_results, where=where)
+                    results[name] = {'documents': lexical['documents'], 'metadatas': lexical['metadatas']}
+                else:
+                    results[name] = self._hybrid_query(name, query, query_embedding, n_results=n_results, where=where)
+            except Exception as e:
+                print(f"Error searching {name}: {str(e)}")
+        
+        return results
+
+    def catalog_fingerprint(self, names: Optional[List[str]] = None) -> str:
+        """Short hash that changes whenever the catalogs behind get_relevant_content change"""
+        parts = []
+        for name in names or ["health_tips", "products"]:
+            with self._counts_lock:
+                generation = self._write_generations.get(name, 0)
+            # Counts catch writes from other nodes; published exports catch their updates too
+            version = self.embedding_store.current_version(name) if self.embedding_store is not None else None
+            parts.append(f"{name}:{self.count(name)}:{generation}:{version}")
+        return hashlib.sha1("|".join(parts).encode('utf-8')).hexdigest()[:16]
+
+    def get_relevant_content(
+        self,
+        query: str,
+        user_profile: Optional[Dict] = None,
+        limit: int = 5,
+        retrieval_mode: Optional[str] = None
+    ) -> Dict:
+        """Get relevant content for a query (retrieval_mode defaults to the manager's)"""
         try:
             print(f"\n=== Getting Relevant Content for Query: {query} ===")
             
@@ -155,31 +998,18 @@ class ChromaDBManager:
                 topics = ' '.join(user_profile['key_topics'])
                 search_query = f"{query} {topics}"
             
-            # Get relevant health tips
-            health_results = self.health_tips.query(
-                query_texts=[search_query],
-                n_results=min(limit, len(self.health_tips.get()['ids']))
-            )
-            
-            # Get relevant products
-            product_results = self.products.query(
-                query_texts=[search_query],
-                n_results=min(limit, len(self.products.get()['ids']))
+            # Embed once (unless lexical-only) and search tips and products
+            results = self.search_collections(
+                search_query,
+                ["health_tips", "products"],
+                limit=limit,
+                retrieval_mode=retrieval_mode
             )
             
-            print(f"Found {len(health_results['documents'][0] if health_results['documents'] else [])} relevant health tips")
-            print(f"Found {len(product_results['documents'][0] if product_results['documents'] else [])} relevant products")
+            print(f"Found {len(results['health_tips']['documents'])} relevant health tips")
+            print(f"Found {len(results['products']['documents'])} relevant products")
             
-            return {
-                'health_tips': {
-                    'documents': health_results['documents'][0] if health_results['documents'] else [],
-                    'metadatas': health_results['metadatas'][0] if health_results['metadatas'] else []
-                },
-                'products': {
-                    'documents': product_results['documents'][0] if product_results['documents'] else [],
-                    'metadatas': product_results['metadatas'][0] if product_results['metadatas'] else []
-                }
-            }
+            return results
             
         except Exception as e:
             print(f"Error getting relevant content: {str(e)}")
@@ -191,58 +1021,62 @@ class ChromaDBManager:
     def get_health_tips(self, category: Optional[str] = None, limit: int = 5) -> Dict:
         """Get health tips with proper error handling"""
         try:
-            if category:
-                results = self.health_tips.query(
-                    query_texts=["health tips"],
-                    where={"category": category},
-                    n_results=min(limit, len(self.health_tips.get()['ids']))
-                )
-            else:
-                results = self.health_tips.query(
-                    query_texts=["health tips"],
-                    n_results=min(limit, len(self.health_tips.get()['ids']))
-                )
+            available = self.count("health_tips", category) if category else self.count("health_tips")
+            if available == 0:
+                return {'documents': [], 'metadatas': []}
             
-            return {
-                'documents': results['documents'][0] if results['documents'] else [],
-                'metadatas': results['metadatas'][0] if results['metadatas'] else []
-            }
+            return self._query_collection(
+                "health_tips",
+                self.embedding_function(["health tips"])[0],
+                n_results=min(limit, available),
+                where={"category": category} if category else None
+            )
             
         except Exception as e:
             print(f"Error getting health tips: {str(e)}")
             return {'documents': [], 'metadatas': []}
 
-    def get_products_by_category(self, category: str) -> Dict:
-        """Get products by category with proper error handling"""
+    def get_products_by_category(self, category: str, limit: int = 5) -> Dict:
+        """Get products by category from the in-memory category index"""
         try:
-            results = self.products.query(
-                query_texts=[""],
-                where={"category": category},
-                n_results=min(5, len(self.products.get()['ids']))
-            )
-            
-            return {
-                'documents': results['documents'][0] if results['documents'] else [],
-                'metadatas': results['metadatas'][0] if results['metadatas'] else []
-            }
+            return self._product_category_index().get(category, limit=limit)
             
         except Exception as e:
             print(f"Error getting products: {str(e)}")
             return {'documents': [], 'metadatas': []}
 
+    def _store_record(self, collection_name: str, record_id: str, document: str, metadata: Dict) -> bool:
+        """Write a record now, or hand it to the write-behind queue when enabled"""
+        if self.write_queue:
+            return self.write_queue.submit({
+                "collection": collection_name,
+                "id": record_id,
+                "document": document,
+                "metadata": metadata
+            })
+        
+        self._add(
+            collection_name,
+            documents=[document],
+            metadatas=[metadata],
+            ids=[record_id]
+        )
+        return True
+
     def store_chat(self, user_id: str, message: str, response: str) -> bool:
         """Store chat with proper error handling"""
         try:
-            chat_id = f"chat_{user_id}_{datetime.now().timestamp()}"
-            self.chat_history.add(
-                documents=[f"User: {message}\nBot: {response}"],
-                metadatas=[{
+            now = datetime.now()
+            chat_id = f"chat_{user_id}_{now.timestamp()}"
+            return self._store_record(
+                self.chat_partition_for(now),
+                chat_id,
+                f"User: {message}\nBot: {response}",
+                {
                     "user_id": user_id,
-                    "timestamp": datetime.now().isoformat()
-                }],
-                ids=[chat_id]
+                    "timestamp": now.isoformat()
+                }
             )
-            return True
         except Exception as e:
             print(f"Error storing chat: {str(e)}")
             return False
@@ -251,37 +1085,85 @@ class ChromaDBManager:
         """Store user feedback"""
         try:
             feedback_id = f"feedback_{user_id}_{datetime.now().timestamp()}"
-            self.feedback.add(
-                documents=[comment],
-                metadatas=[{
+            return self._store_record(
+                "feedback",
+                feedback_id,
+                comment,
+                {
                     "user_id": user_id,
                     "rating": rating,
                     "timestamp": datetime.now().isoformat()
-                }],
-                ids=[feedback_id]
+                }
             )
-            return True
         except Exception as e:
             print(f"Error storing feedback: {str(e)}")
             return False
 
-    def get_chat_history(self, user_id: str, limit: int = 10) -> Dict:
-        """Get chat history with proper error handling"""
+    def _get_shared_chat_history(self, user_id: str, limit: int, before: Optional[str]) -> Dict:
+        """History read from the server (turns may have been written by other nodes)"""
+        # Another node may have opened a new month's partition
+        with self._collections_lock:
+            self._chat_partitions = None
+        
+        turns = []
+        for partition in reversed(self.chat_partitions()):
+            results = self._collection(partition).get(where={"user_id": user_id}, include=["documents", "metadatas"])
+            turns.extend(zip(results['ids'], results['documents'], results['metadatas']))
+            if before is None and len(turns) > limit:
+                # Newest partitions first: older ones cannot change this page
+                break
+        
+        turns.sort(key=lambda turn: (ChatHistoryIndex._timestamp(turn[2] or {}), turn[0]))
+        end = len(turns)
+        if before:
+            positions = [i for i, turn in enumerate(turns) if turn[0] == before]
+            if not positions:
+                return {'documents': [], 'metadatas': [], 'next_cursor': None}
+            end = positions[0]
+        start = max(0, end - limit)
+        page = turns[start:end]
+        return {
+            'documents': [document for _, document, _ in page],
+            'metadatas': [metadata for _, _, metadata in page],
+            'next_cursor': page[0][0] if page and start > 0 else None
+        }
+
+    def get_chat_history(self, user_id: str, limit: int = 10, before: Optional[str] = None) -> Dict:
+        """Get the latest chat turns for a user in time order, with cursor pagination"""
         try:
-            results = self.chat_history.query(
-                query_texts=[""],
-                where={"user_id": user_id},
-                n_results=min(limit, len(self.chat_history.get()['ids']))
-            )
+            if self.shared_store:
+                return self._get_shared_chat_history(user_id, limit, before)
+            
+            self._ensure_chat_history()
+            with self._counts_lock:
+                page_ids, next_cursor = self._history_index.latest(user_id, limit, before=before)
+            if not page_ids:
+                return {'documents': [], 'metadatas': [], 'next_cursor': None}
+            
+            # Only touch the partitions that hold this page
+            by_partition: Dict[str, List[str]] = {}
+            for chat_id in page_ids:
+                by_partition.setdefault(self._history_index.partition_of(chat_id), []).append(chat_id)
+            
+            # get() does not preserve the requested order
+            records = {}
+            for partition, chat_ids in by_partition.items():
+                if partition is None:
+                    continue
+                results = self._collection(partition).get(ids=chat_ids, include=["documents", "metadatas"])
+                for chat_id, document, metadata in zip(results['ids'], results['documents'], results['metadatas']):
+                    records[chat_id] = (document, metadata)
+            ordered = [records[chat_id] for chat_id in page_ids if chat_id in records]
             
             return {
-                'documents': results['documents'][0] if results['documents'] else [],
-                'metadatas': results['metadatas'][0] if results['metadatas'] else []
+                'documents': [document for document, _ in ordered],
+                'metadatas': [metadata for _, metadata in ordered],
+                'next_cursor': next_cursor
             }
             
         except Exception as e:
             print(f"Error getting chat history: {str(e)}")
-            return {'documents': [], 'metadatas': []}
+            return {'documents': [], 'metadatas': [], 'next_cursor': None}
         
 
 
@@ -289,57 +1171,145 @@ class ChromaDBManager:
 ChromaDBManager: Core Database Management System for Health Chatbot
 
 This class manages all database operations using ChromaDB, a vector database that enables 
-semantic search capabilities. It handles five main collections:
+semantic search capabilities. It handles six main collections:
 
 1. health_tips: Stores health-related tips and advice
 2. products: Stores product information and descriptions
-3. chat_history: Stores user conversations
-4. feedback: Stores user feedback and ratings
-5. user_profiles: Stores user information and preferences
+3. faqs: Stores frequently asked questions and answers
+4. chat_history: Stores user conversations
+5. feedback: Stores user feedback and ratings
+6. user_profiles: Stores user information and preferences
 
 Key Features:
 - Vector embeddings for semantic search
+- Shared embedding cache (CachedEmbeddingFunction) for all collections
 - Automatic data persistence
 - Default data initialization
 - Error handling for all operations
+- Maintained collection counters (no full scans when sizing queries)
 - User profile management
 - Context-aware content retrieval
 
 Collections Structure:
 1. health_tips:
    - documents: tip text
-   - metadata: category
+   - metadata: category (content_hash when ingested)
    - ids: unique tip identifier
 
 2. products:
    - documents: product descriptions
-   - metadata: name, category, price
+   - metadata: name, category, price (content_hash when ingested)
    - ids: unique product identifier
 
-3. chat_history:
+3. faqs:
+   - documents: question and answer text
+   - metadata: question, category, content_hash
+   - ids: unique FAQ identifier
+
+4. chat_history (monthly partitions chat_history_YYYYMM):
    - documents: conversation text
    - metadata: user_id, timestamp
    - ids: unique chat identifier
 
-4. feedback:
+5. feedback:
    - documents: feedback comments
    - metadata: user_id, rating, timestamp
    - ids: unique feedback identifier
 
-5. user_profiles:
+6. user_profiles:
    - documents: profile summary
-   - metadata: user preferences and history
+   - metadata: user_id, profile_v, topic_bits, profile_blob (see profile_codec)
    - ids: unique profile identifier
 
 Main Methods:
 - get_user_profile(): Retrieves user profile information
 - store_user_profile(): Stores or updates user profiles
-- get_relevant_content(): Performs semantic search for relevant content
+- search_collections(): Embeds a query once and searches any set of collections
+- get_relevant_content(): Retrieves relevant tips/products (vector, lexical or hybrid)
+- catalog_fingerprint(): Version hash of the catalogs, for invalidating answer caches
 - get_health_tips(): Retrieves health tips by category
-- get_products_by_category(): Retrieves products by category
+- get_products_by_category(): Lists products in a category (in-memory lookup)
 - store_chat(): Stores chat interactions
 - store_feedback(): Stores user feedback
-- get_chat_history(): Retrieves chat history
+- get_chat_history(): Retrieves the latest turns for a user, oldest first
+- upsert_records(): Bulk upsert with optional precomputed embeddings
+- delete_records(): Bulk delete by id
+- get_content_hashes(): Stored content hashes for idempotent ingestion
+- export_embeddings(): Publishes catalog embeddings for memory-mapped sharing
+- export_snapshot() / import_snapshot(): Move a collection between nodes
+  (ids, documents, metadata, embeddings) without re-embedding
+
+Collection Counters:
+- Totals and per-category / per-user counts loaded once at startup
+- Kept in sync by _add(), _upsert() and _delete()
+- count(name, field_value) sizes n_results in O(1)
+
+In-Memory Catalog Index (use_memory_index=True):
+- health_tips and products mirrored as float32 matrices (InMemoryVectorIndex)
+- Exact top-k via dot products + argpartition, category filters as masks
+- Mirrors marked stale on write and rebuilt on the next lookup
+
+Shared Embedding Exports (embedding_store_path):
+- export_embeddings() publishes catalog ids + embeddings as versioned .npy
+  files (EmbeddingStore) and swaps a CURRENT pointer atomically
+- In-memory mirrors are built on np.memmap views of the current export, so
+  all worker processes share one page-cache copy of the matrix
+- Newly published versions are picked up without a restart
+- After a local catalog write the mirror falls back to Chroma until the
+  next export
+
+Write-Behind Storage (write_behind=True):
+- store_chat()/store_feedback() enqueue records instead of writing inline
+- WriteBehindQueue group-commits them in batched upserts
+- NDJSON spill file in persist_directory is replayed after a crash
+- Queue flushed on interpreter shutdown
+
+Chat History Reads:
+- ChatHistoryIndex keeps (user_id, timestamp) -> chat id in memory
+- get_chat_history() fetches the last N turns by id, no vector search
+- Pass next_cursor back as `before` to page through older turns
+
+Product Category Index:
+- CategoryIndex maps category -> products ordered by name
+- Built on first use / warm-up, updated on every product write
+- get_products_by_category() never embeds or runs an ANN search
+
+Quantized Product Index (quantized_index="sq8" or "pq"):
+- QuantizedVectorIndex keeps uint8 codes instead of float32 vectors
+  (sq8 ~4x smaller, pq ~15x smaller; optional IVF partitioning)
+- Unfiltered product queries take rescore_factor x k approximate candidates
+  and re-rank them exactly against their stored embeddings
+- Retrained lazily after product writes; filtered queries use the regular path
+- benchmark_index.py reports recall@k, bytes/vector and latency
+
+Hybrid Retrieval (retrieval_mode="hybrid"):
+- BM25Index (lexical_index.py) over tips, products and FAQs, built on first use
+- Kept in sync on every catalog write, like the category index
+- Vector and BM25 top-(4 x limit) candidates fused by reciprocal rank
+- "lexical" skips embedding entirely; "vector" is the original behaviour
+- Mode set per manager and overridable per call
+
+Chat History Partitions:
+- store_chat() writes to the partition for the current month
+- prune_chat_history() drops whole partitions past chat_retention_months
+  (runs during warm_up() and whenever a new month's partition is created)
+- History reads fetch only from partitions holding the requested turns
+- A legacy unpartitioned chat_history collection is read but never pruned
+
+Client/Server Mode (client_mode="http"):
+- Talks to a Chroma server (chroma run --path ...) through one HttpClient
+  whose connection pool is sized by http_pool_size
+- Many app nodes share one store; get_chat_history() reads per-user turns
+  from the server because other nodes write them too
+- AsyncChromaDBManager exposes the same API as coroutines on a bounded pool
+
+Fast Startup:
+- Collections opened on first access (_collection())
+- Embedding model imported/loaded on first embedding
+- Counters and the chat history index loaded per collection on first use
+- Default data check is a count() probe
+- warm_up() does all of the above in a background thread
+- Per-phase timings kept in startup_timings and logged
 
 Error Handling:
 - All methods include try-except blocks
@@ -348,6 +1318,7 @@ Error Handling:
 
 Vector Search:
 - Uses DefaultEmbeddingFunction for text vectorization
+- Each query is embedded once, then fanned out to every collection searched
 - Enables semantic similarity search
 - Supports context-aware retrievals
 
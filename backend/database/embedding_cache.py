@@ -0,0 +1,234 @@
+# backend/database/embedding_cache.py
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+
+class CachedEmbeddingFunction(EmbeddingFunction[Documents]):
+    def __init__(
+        self,
+        embedding_function=None,
+        max_size: int = 10000,
+        ttl_seconds: Optional[float] = 86400,
+        persist_path: Optional[str] = None,
+        factory: Optional[Callable] = None
+    ):
+        # Either a ready embedding function or a factory (e.g. the DefaultEmbeddingFunction
+        # class) that is only invoked on first use, keeping model imports off startup
+        self._embedding_function = embedding_function
+        self._factory = factory
+        self._factory_lock = threading.Lock()
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.persist_path = persist_path
+
+        # normalized text -> (embedding, created_at), least recently used first
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if persist_path:
+            self.load()
+
+    @property
+    def embedding_function(self):
+        if self._embedding_function is None:
+            with self._factory_lock:
+                if self._embedding_function is None:
+                    self._embedding_function = self._factory()
+        return self._embedding_function
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._embedding_function is not None
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Cache key for a text; the default model is uncased, so case is dropped"""
+        return " ".join(text.lower().split())
+
+    def __call__(self, input: Documents) -> Embeddings:
+        """Embed texts, only sending cache misses to the wrapped function"""
+        keys = [self.normalize(text) for text in input]
+        embeddings: List[Optional[np.ndarray]] = [None] * len(keys)
+        missing: Dict[str, List[int]] = {}
+        now = time.time()
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._cache.get(key)
+                if entry is not None and not self._is_expired(entry, now):
+                    self._cache.move_to_end(key)
+                    embeddings[i] = entry[0]
+                    self.hits += 1
+                else:
+                    if entry is not None:
+                        del self._cache[key]
+                    missing.setdefault(key, []).append(i)
+                    self.misses += 1
+
+        if missing:
+            texts = [input[positions[0]] for positions in missing.values()]
+            computed = self.embedding_function(texts)
+
+            with self._lock:
+                for (key, positions), embedding in zip(missing.items(), computed):
+                    embedding = np.asarray(embedding, dtype=np.float32)
+                    for i in positions:
+                        embeddings[i] = embedding
+                    self._cache[key] = (embedding, now)
+                    self._cache.move_to_end(key)
+                self._evict()
+
+        return embeddings
+
+    def _is_expired(self, entry: tuple, now: float) -> bool:
+        return self.ttl_seconds is not None and now - entry[1] > self.ttl_seconds
+
+    def _evict(self):
+        """Drop least recently used entries beyond max_size (caller holds the lock)"""
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict:
+        """Hit/miss/eviction counters"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def save(self) -> bool:
+        """Persist unexpired entries to persist_path"""
+        if not self.persist_path:
+            return False
+        try:
+            now = time.time()
+            with self._lock:
+                entries = [
+                    (key, entry) for key, entry in self._cache.items()
+                    if not self._is_expired(entry, now)
+                ]
+            if not entries:
+                return False
+
+            os.makedirs(os.path.dirname(os.path.abspath(self.persist_path)), exist_ok=True)
+            tmp_path = f"{self.persist_path}.tmp"
+            with open(tmp_path, 'wb') as file:
+                np.savez(
+                    file,
+                    keys=np.array([key for key, _ in entries]),
+                    embeddings=np.stack([entry[0] for _, entry in entries]),
+                    created_at=np.array([entry[1] for _, entry in entries], dtype=np.float64)
+                )
+            os.replace(tmp_path, self.persist_path)
+            print(f"Saved {len(entries)} cached embeddings to {self.persist_path}")
+            return True
+
+        except Exception as e:
+            print(f"Error saving embedding cache: {str(e)}")
+            return False
+
+    def load(self) -> int:
+        """Load persisted entries, skipping expired ones"""
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return 0
+        try:
+            now = time.time()
+            with np.load(self.persist_path, allow_pickle=False) as data:
+                keys = data['keys']
+                embeddings = data['embeddings']
+                created_at = data['created_at']
+
+            with self._lock:
+                for key, embedding, created in zip(keys, embeddings, created_at):
+                    entry = (embedding.astype(np.float32), float(created))
+                    if not self._is_expired(entry, now):
+                        self._cache[str(key)] = entry
+                self._evict()
+            print(f"Loaded {len(self._cache)} cached embeddings from {self.persist_path}")
+            return len(self._cache)
+
+        except Exception as e:
+            print(f"Error loading embedding cache: {str(e)}")
+            return 0
+
+    # Chroma stores the embedding function config with each collection;
+    # report the wrapped function's identity so existing collections still match.
+    def name(self) -> str:
+        if self._embedding_function is None and self._factory is not None:
+            # name() is static on Chroma's embedding functions; no need to build one
+            return self._factory.name()
+        return self.embedding_function.name()
+
+    def get_config(self) -> Dict:
+        return self.embedding_function.get_config()
+
+    def default_space(self):
+        return self.embedding_function.default_space()
+
+    def supported_spaces(self):
+        return self.embedding_function.supported_spaces()
+
+    def is_legacy(self) -> bool:
+        return self.embedding_function.is_legacy()
+
+
+
+"""
+CachedEmbeddingFunction: Bounded Embedding Cache for ChromaDB Collections
+
+This class wraps an embedding function (DefaultEmbeddingFunction by default)
+so repeated texts are embedded only once. WhatsApp traffic is dominated by a
+small set of short, recurring questions, so most query embeddings become
+dictionary lookups instead of ONNX inference.
+
+Key Features:
+1. Cache Keys:
+   - Lower-cased, whitespace-collapsed text
+   - Safe because the default MiniLM model is uncased
+
+2. Bounds:
+   - LRU eviction beyond max_size entries
+   - Optional per-entry TTL (ttl_seconds)
+
+3. Metrics:
+   - hits, misses, evictions, hit_rate via stats()
+
+4. Persistence (optional):
+   - save() writes unexpired entries to an .npz file atomically
+   - load() restores them on startup
+
+Lazy Loading:
+- Pass factory= instead of an instance to defer building the wrapped
+  function (and its model imports) until the first embedding is needed
+
+Chroma Compatibility:
+- name()/get_config() delegate to the wrapped function so collections
+  created with DefaultEmbeddingFunction keep validating
+
+Usage Example:
+embedding_function = CachedEmbeddingFunction(
+    factory=embedding_functions.DefaultEmbeddingFunction,
+    max_size=10000,
+    persist_path="data/chromadb/embedding_cache.npz"
+)
+vectors = embedding_function(["how to sleep better"])
+print(embedding_function.stats())
+"""
@@ -0,0 +1,154 @@
+# backend/database/embedding_store.py
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class MappedEmbeddings:
+    def __init__(self, path: str, version: str):
+        self.path = path
+        self.version = version
+        with open(os.path.join(path, "manifest.json"), 'r', encoding='utf-8') as file:
+            self.manifest = json.load(file)
+        # Read-only mappings: every process shares the same page-cache copy
+        self.embeddings = np.load(os.path.join(path, "embeddings.npy"), mmap_mode='r')
+        self.ids = np.load(os.path.join(path, "ids.npy"), mmap_mode='r')
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def id_list(self) -> List[str]:
+        return [str(record_id) for record_id in self.ids]
+
+
+class EmbeddingStore:
+    CURRENT = "CURRENT"
+    FORMAT_VERSION = 1
+
+    def __init__(self, root: str, keep_versions: int = 2, check_interval: float = 5.0):
+        self.root = root
+        self.keep_versions = keep_versions
+        # Seconds between CURRENT pointer checks per collection
+        self.check_interval = check_interval
+        self._opened: Dict[str, MappedEmbeddings] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _collection_dir(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def current_version(self, name: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self._collection_dir(name), self.CURRENT), 'r', encoding='utf-8') as file:
+                return file.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def publish(self, name: str, ids: List[str], embeddings) -> str:
+        """Write a new version and atomically point CURRENT at it"""
+        embeddings = np.ascontiguousarray(np.asarray(embeddings, dtype=np.float32))
+        collection_dir = self._collection_dir(name)
+        os.makedirs(collection_dir, exist_ok=True)
+
+        version = f"v{time.time_ns()}"
+        staging = os.path.join(collection_dir, f".{version}.tmp")
+        os.makedirs(staging)
+        np.save(os.path.join(staging, "embeddings.npy"), embeddings)
+        np.save(os.path.join(staging, "ids.npy"), np.array(ids, dtype=str))
+        with open(os.path.join(staging, "manifest.json"), 'w', encoding='utf-8') as file:
+            json.dump({
+                "format": self.FORMAT_VERSION,
+                "collection": name,
+                "version": version,
+                "count": len(ids),
+                "dimension": int(embeddings.shape[1]) if embeddings.ndim == 2 else 0,
+                "created_at": time.time()
+            }, file)
+        os.rename(staging, os.path.join(collection_dir, version))
+
+        pointer = os.path.join(collection_dir, f"{self.CURRENT}.tmp")
+        with open(pointer, 'w', encoding='utf-8') as file:
+            file.write(version)
+        os.replace(pointer, os.path.join(collection_dir, self.CURRENT))
+
+        self._prune(name, version)
+        return version
+
+    def _prune(self, name: str, current: str):
+        """Delete all but the newest keep_versions versions (open mappings stay valid on POSIX)"""
+        collection_dir = self._collection_dir(name)
+        versions = sorted(
+            entry for entry in os.listdir(collection_dir)
+            if entry.startswith("v") and os.path.isdir(os.path.join(collection_dir, entry))
+        )
+        for version in versions[:-self.keep_versions] if self.keep_versions > 0 else versions:
+            if version != current:
+                shutil.rmtree(os.path.join(collection_dir, version), ignore_errors=True)
+
+    def open(self, name: str) -> Optional[MappedEmbeddings]:
+        """Mapping of the current version, switching to a newer one once it is published"""
+        now = time.monotonic()
+        opened = self._opened.get(name)
+        if opened is not None and now - self._checked_at.get(name, 0.0) < self.check_interval:
+            return opened
+
+        with self._lock:
+            self._checked_at[name] = now
+            version = self.current_version(name)
+            if version is None:
+                self._opened.pop(name, None)
+                return None
+            opened = self._opened.get(name)
+            if opened is None or opened.version != version:
+                try:
+                    opened = MappedEmbeddings(os.path.join(self._collection_dir(name), version), version)
+                except (OSError, ValueError) as e:
+                    print(f"Error opening embeddings for {name} ({version}): {str(e)}")
+                    return self._opened.get(name)
+                self._opened[name] = opened
+            return opened
+
+
+
+"""
+EmbeddingStore: Versioned, Memory-Mapped Embedding Exports
+
+Each Flask/gunicorn worker otherwise loads its own copy of every catalog
+embedding. This module exports a collection's ids and embeddings to flat
+.npy files that workers open read-only with np.load(mmap_mode='r'), so the
+OS page cache holds a single copy shared by all processes and opening an
+export parses only a small header.
+
+Layout:
+<root>/<collection>/
+├── CURRENT              (name of the live version)
+├── v1718000000000000000/
+│   ├── embeddings.npy   (float32, rows = records)
+│   ├── ids.npy          (fixed-width unicode, same row order)
+│   └── manifest.json    (format, count, dimension, created_at)
+└── v1718000500000000000/
+
+Publishing:
+- publish() writes a new version into a staging directory, renames it
+  into place and then swaps CURRENT with os.replace (atomic)
+- Readers never see a partially written version
+- Only the newest keep_versions versions are kept; processes still mapping
+  an older version keep reading it until they switch
+
+Reading:
+- open(name) returns the mapping for CURRENT
+- CURRENT is re-checked at most every check_interval seconds, so a newly
+  published catalog is picked up without restarting workers
+
+Usage Example:
+store = EmbeddingStore("data/embeddings")
+store.publish("products", ids, embeddings)
+mapped = store.open("products")
+matrix = mapped.embeddings  # np.memmap, shared across processes
+"""
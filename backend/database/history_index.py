@@ -0,0 +1,105 @@
+# backend/database/history_index.py
+import bisect
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+class ChatHistoryIndex:
+    def __init__(self):
+        # user_id -> [(timestamp, chat_id)] kept sorted by time
+        self._entries: Dict[str, List[Tuple[float, str]]] = {}
+        # chat_id -> (user_id, timestamp, partition) for removals, cursors and fetches
+        self._locations: Dict[str, Tuple[str, float, str]] = {}
+
+    @staticmethod
+    def _timestamp(metadata: Dict) -> float:
+        try:
+            return datetime.fromisoformat(metadata.get("timestamp", "")).timestamp()
+        except (TypeError, ValueError):
+            return 0.0
+
+    def add(self, ids: List[str], metadatas: List[Optional[Dict]], partition: str = "chat_history"):
+        """Index chat records (stored in `partition`) by (user_id, timestamp)"""
+        for chat_id, metadata in zip(ids, metadatas):
+            metadata = metadata or {}
+            user_id = metadata.get("user_id")
+            if user_id is None:
+                continue
+            if chat_id in self._locations:
+                self.remove([chat_id])
+            timestamp = self._timestamp(metadata)
+            bisect.insort(self._entries.setdefault(user_id, []), (timestamp, chat_id))
+            self._locations[chat_id] = (user_id, timestamp, partition)
+
+    def remove(self, ids: List[str]):
+        for chat_id in ids:
+            location = self._locations.pop(chat_id, None)
+            if location is None:
+                continue
+            user_id, timestamp, _ = location
+            entries = self._entries.get(user_id, [])
+            position = bisect.bisect_left(entries, (timestamp, chat_id))
+            if position < len(entries) and entries[position] == (timestamp, chat_id):
+                del entries[position]
+            if not entries:
+                self._entries.pop(user_id, None)
+
+    def remove_partition(self, partition: str):
+        """Forget every record stored in a dropped partition"""
+        self.remove([
+            chat_id for chat_id, location in self._locations.items()
+            if location[2] == partition
+        ])
+
+    def partition_of(self, chat_id: str) -> Optional[str]:
+        location = self._locations.get(chat_id)
+        return location[2] if location else None
+
+    def count(self, user_id: str) -> int:
+        return len(self._entries.get(user_id, []))
+
+    def latest(self, user_id: str, limit: int, before: Optional[str] = None) -> Tuple[List[str], Optional[str]]:
+        """Ids of the last `limit` turns (oldest first) before the cursor, plus the next cursor"""
+        entries = self._entries.get(user_id, [])
+        end = len(entries)
+        if before:
+            location = self._locations.get(before)
+            if location is None or location[0] != user_id:
+                return [], None
+            end = bisect.bisect_left(entries, (location[1], before))
+
+        start = max(0, end - limit)
+        page = [chat_id for _, chat_id in entries[start:end]]
+        next_cursor = page[0] if page and start > 0 else None
+        return page, next_cursor
+
+
+
+"""
+ChatHistoryIndex: Per-User, Time-Ordered Index Over Chat History Records
+
+This class keeps an in-memory index of chat_history ids keyed by
+(user_id, timestamp) so the latest turns of a conversation can be read by
+primary id instead of running a similarity search for an empty string.
+
+Key Features:
+1. Ordering:
+   - Sorted (timestamp, chat_id) list per user (bisect insertion)
+   - Reads cost O(log n + limit) in the user's own history size
+
+2. Pagination:
+   - latest(user_id, limit) returns the newest turns, oldest first
+   - next_cursor is the oldest returned id; pass it as `before` for older pages
+
+3. Maintenance:
+   - Built from chat history partition metadata on first use
+   - ChromaDBManager updates it on every add/upsert/delete
+   - Remembers each record's partition so reads only touch partitions
+     that hold the requested page; remove_partition() drops a whole month
+
+Usage Example:
+index = ChatHistoryIndex()
+index.add(ids, metadatas)
+page, cursor = index.latest("user123", limit=10)
+older, cursor = index.latest("user123", limit=10, before=cursor)
+"""
@@ -0,0 +1,198 @@
+# backend/database/incremental_indexer.py
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from database.ingestion import CATALOGS, iter_batches, iter_records
+
+
+class IncrementalIndexer:
+    MANIFEST_VERSION = 1
+
+    def __init__(self, db_manager, data_dir: str, manifest_path: Optional[str] = None, batch_size: int = 256):
+        self.db_manager = db_manager
+        self.data_dir = data_dir
+        # The manifest describes what is stored, so it lives with the database
+        self.manifest_path = manifest_path or os.path.join(db_manager.persist_directory, "index_manifest.json")
+        self.batch_size = batch_size
+        self._sync_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict:
+        """{catalog: {"path", "mtime_ns", "size", "hashes": {id: content_hash}}}"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as file:
+                manifest = json.load(file)
+            if manifest.get("version") == self.MANIFEST_VERSION:
+                return manifest
+            print(f"Ignoring index manifest with version {manifest.get('version')}")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Error loading index manifest: {str(e)}")
+        return {"version": self.MANIFEST_VERSION, "catalogs": {}}
+
+    def _save_manifest(self):
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(self.manifest, file)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _catalog_path(self, name: str) -> Optional[str]:
+        for extension in ('.json', '.ndjson', '.jsonl'):
+            path = os.path.join(self.data_dir, f"{name}{extension}")
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _known_hashes(self, name: str) -> Dict[str, str]:
+        """Hashes from the manifest, bootstrapped from the collection on first run"""
+        entry = self.manifest["catalogs"].get(name)
+        if entry is not None:
+            return dict(entry["hashes"])
+        # Records without a content_hash (seed data) were never loaded from the catalog
+        stored = self.db_manager.get_content_hashes(name)
+        return {record_id: value for record_id, value in stored.items() if value}
+
+    def sync_catalog(self, name: str) -> Optional[Dict]:
+        """Apply the diff between a catalog file and the manifest; None if the file is unchanged"""
+        path = self._catalog_path(name)
+        if path is None:
+            return None
+        stat = os.stat(path)
+        entry = self.manifest["catalogs"].get(name)
+        if entry and entry["path"] == path and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return None
+
+        key, to_record = CATALOGS[name]
+        known = self._known_hashes(name)
+        current: Dict[str, str] = {}
+        stats = {"collection": name, "read": 0, "added": 0, "updated": 0, "deleted": 0, "unchanged": 0, "failed": 0}
+        started = time.perf_counter()
+
+        for ids, documents, metadatas in iter_batches(iter_records(path, key), to_record, self.batch_size):
+            stats["read"] += len(ids)
+            changed = []
+            for i, record_id in enumerate(ids):
+                content_hash = metadatas[i]["content_hash"]
+                current[record_id] = content_hash
+                if known.get(record_id) == content_hash:
+                    stats["unchanged"] += 1
+                else:
+                    changed.append(i)
+            if not changed:
+                continue
+
+            batch_ids = [ids[i] for i in changed]
+            batch_documents = [documents[i] for i in changed]
+            if self.db_manager.upsert_records(
+                name,
+                batch_ids,
+                batch_documents,
+                [metadatas[i] for i in changed],
+                embeddings=self.db_manager.embedding_function(batch_documents)
+            ):
+                for record_id in batch_ids:
+                    stats["updated" if record_id in known else "added"] += 1
+            else:
+                stats["failed"] += len(batch_ids)
+                # Retry these on the next sync
+                for record_id in batch_ids:
+                    current.pop(record_id, None)
+
+        removed = [record_id for record_id in known if record_id not in current]
+        for start in range(0, len(removed), self.batch_size):
+            batch = removed[start:start + self.batch_size]
+            if self.db_manager.delete_records(name, batch):
+                stats["deleted"] += len(batch)
+            else:
+                stats["failed"] += len(batch)
+                # Keep them in the manifest so the delete is retried
+                current.update({record_id: known[record_id] for record_id in batch})
+
+        self.manifest["catalogs"][name] = {
+            "path": path,
+            # A failed batch leaves the file marked as changed so the next sync retries it
+            "mtime_ns": stat.st_mtime_ns if not stats["failed"] else 0,
+            "size": stat.st_size,
+            "hashes": current
+        }
+        self._save_manifest()
+
+        stats["seconds"] = round(time.perf_counter() - started, 3)
+        print(
+            f"Synced {name}: {stats['added']} added, {stats['updated']} updated, {stats['deleted']} deleted, "
+            f"{stats['unchanged']} unchanged, {stats['failed']} failed ({stats['seconds']}s)"
+        )
+        return stats
+
+    def sync(self) -> List[Dict]:
+        """Sync every catalog file whose size or mtime changed since the last sync"""
+        results = []
+        with self._sync_lock:
+            for name in CATALOGS:
+                try:
+                    result = self.sync_catalog(name)
+                    if result is not None:
+                        results.append(result)
+                except Exception as e:
+                    print(f"Error syncing {name}: {str(e)}")
+        return results
+
+    def start_watching(self, interval: float = 5.0):
+        """Poll the data directory in a background thread and apply changes live"""
+        if self._watcher and self._watcher.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.is_set():
+                self.sync()
+                self._stop.wait(interval)
+
+        self._watcher = threading.Thread(target=run, name="catalog-indexer", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+        if self._watcher:
+            self._watcher.join()
+
+
+
+"""
+IncrementalIndexer: Change-Detection Indexing for Health Knowledge Catalogs
+
+Re-running a full ingestion reads every stored hash and touches every
+record. This class keeps a manifest of per-record content hashes with the
+database and applies only the difference between a catalog file and the
+manifest, so an edit costs work proportional to the diff.
+
+Key Features:
+1. Change Detection:
+   - Files whose size and mtime match the manifest are skipped unopened
+   - Each record hashed with ingestion.content_hash (document + metadata)
+   - New/changed records embedded and upserted in batches
+   - Records missing from the file deleted from the collection
+
+2. Manifest (index_manifest.json in the ChromaDB directory):
+   - {"version": 1, "catalogs": {name: {path, mtime_ns, size, hashes}}}
+   - Written atomically after each catalog
+   - Bootstrapped from stored content_hash metadata on first run, so an
+     already-ingested database is not re-embedded (seed records without
+     a hash are never deleted)
+   - Failed batches are left out so the next sync retries them
+
+3. Live Updates:
+   - start_watching(interval) polls the directory in a daemon thread
+   - Writes go through ChromaDBManager, so counters and indexes stay in sync
+
+Usage Example:
+indexer = IncrementalIndexer(db_manager, "data/health_knowledge")
+indexer.sync()
+indexer.start_watching(interval=5.0)
+"""
@@ -0,0 +1,202 @@
+# backend/database/ingestion.py
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Catalog name -> (JSON top-level key, record -> (id, document, metadata))
+CATALOGS: Dict[str, Tuple[str, Callable[[Dict], Tuple[str, str, Dict]]]] = {
+    "health_tips": (
+        "tips",
+        lambda tip: (tip['id'], tip['text'], {"category": tip['category']})
+    ),
+    "faqs": (
+        "faqs",
+        lambda faq: (
+            faq['id'],
+            f"Q: {faq['question']}\nA: {faq['answer']}",
+            {"question": faq['question'], "category": faq['category']}
+        )
+    ),
+    "products": (
+        "products",
+        lambda product: (
+            product['id'],
+            product['description'],
+            {"name": product['name'], "category": product['category'], "price": product['price']}
+        )
+    ),
+}
+
+# Embedding function owned by each pool worker process
+_worker_embedding_function = None
+
+
+def _init_worker():
+    global _worker_embedding_function
+    from chromadb.utils import embedding_functions
+    _worker_embedding_function = embedding_functions.DefaultEmbeddingFunction()
+
+
+def _embed_batch(documents: List[str]) -> List[List[float]]:
+    """Runs in a pool worker; returns plain lists so results pickle cheaply"""
+    return [list(map(float, embedding)) for embedding in _worker_embedding_function(documents)]
+
+
+def content_hash(document: str, metadata: Dict) -> str:
+    """Stable hash of a record's content, used to skip unchanged records"""
+    payload = json.dumps({"document": document, "metadata": metadata}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def iter_records(path: str, key: str) -> Iterator[Dict]:
+    """Yield records from a {key: [...]} JSON file or stream an NDJSON file line by line"""
+    if path.endswith(('.ndjson', '.jsonl')):
+        with open(path, 'r', encoding='utf-8') as file:
+            for line in file:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+    else:
+        with open(path, 'r', encoding='utf-8') as file:
+            yield from json.load(file).get(key, [])
+
+
+def iter_batches(records: Iterator[Dict], to_record: Callable, batch_size: int) -> Iterator[Tuple[List, List, List]]:
+    """Group records into (ids, documents, metadatas) batches with content hashes attached"""
+    ids, documents, metadatas = [], [], []
+    for raw in records:
+        record_id, document, metadata = to_record(raw)
+        metadata = dict(metadata, content_hash=content_hash(document, metadata))
+        ids.append(str(record_id))
+        documents.append(document)
+        metadatas.append(metadata)
+        if len(ids) >= batch_size:
+            yield ids, documents, metadatas
+            ids, documents, metadatas = [], [], []
+    if ids:
+        yield ids, documents, metadatas
+
+
+class IngestionPipeline:
+    def __init__(self, db_manager, batch_size: int = 256, workers: Optional[int] = None):
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        # 0 workers embeds in-process with the manager's (cached) embedding function
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+
+    def _changed(self, name: str, ids: List[str], documents: List[str], metadatas: List[Dict]):
+        """Drop records whose stored content_hash already matches"""
+        stored = self.db_manager.get_content_hashes(name, ids)
+        keep = [
+            i for i, record_id in enumerate(ids)
+            if stored.get(record_id) != metadatas[i]["content_hash"]
+        ]
+        return (
+            [ids[i] for i in keep],
+            [documents[i] for i in keep],
+            [metadatas[i] for i in keep]
+        )
+
+    def ingest(self, name: str, path: str) -> Dict:
+        """Stream one catalog file into its collection; returns throughput stats"""
+        key, to_record = CATALOGS[name]
+        stats = {"collection": name, "path": path, "read": 0, "skipped": 0, "upserted": 0, "failed": 0}
+        started = time.perf_counter()
+
+        batches = iter_batches(iter_records(path, key), to_record, self.batch_size)
+
+        def upsert(ids, documents, metadatas, embeddings):
+            if self.db_manager.upsert_records(name, ids, documents, metadatas, embeddings=embeddings):
+                stats["upserted"] += len(ids)
+            else:
+                stats["failed"] += len(ids)
+
+        if self.workers <= 0:
+            for ids, documents, metadatas in batches:
+                stats["read"] += len(ids)
+                changed = self._changed(name, ids, documents, metadatas)
+                stats["skipped"] += len(ids) - len(changed[0])
+                if changed[0]:
+                    upsert(*changed, self.db_manager.embedding_function(changed[1]))
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as executor:
+                # Bound in-flight batches so large files are never fully in memory
+                in_flight = {}
+                for ids, documents, metadatas in batches:
+                    stats["read"] += len(ids)
+                    changed = self._changed(name, ids, documents, metadatas)
+                    stats["skipped"] += len(ids) - len(changed[0])
+                    if not changed[0]:
+                        continue
+                    in_flight[executor.submit(_embed_batch, changed[1])] = changed
+
+                    if len(in_flight) >= self.workers * 2:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            upsert(*in_flight.pop(future), future.result())
+
+                for future in list(in_flight):
+                    upsert(*in_flight.pop(future), future.result())
+
+        elapsed = time.perf_counter() - started
+        stats["seconds"] = round(elapsed, 3)
+        stats["docs_per_sec"] = round(stats["read"] / elapsed, 1) if elapsed > 0 else 0.0
+        print(
+            f"Ingested {name} from {os.path.basename(path)}: {stats['read']} read, "
+            f"{stats['upserted']} upserted, {stats['skipped']} unchanged, {stats['failed']} failed "
+            f"({stats['docs_per_sec']} docs/sec)"
+        )
+        return stats
+
+    def ingest_directory(self, data_dir: str) -> List[Dict]:
+        """Ingest every <catalog>.json / .ndjson / .jsonl file found in data_dir"""
+        results = []
+        for name in CATALOGS:
+            for extension in ('.json', '.ndjson', '.jsonl'):
+                path = os.path.join(data_dir, f"{name}{extension}")
+                if os.path.exists(path):
+                    results.append(self.ingest(name, path))
+        return results
+
+
+
+"""
+IngestionPipeline: Streaming Bulk Loader for Health Knowledge Catalogs
+
+This module loads health tips, FAQs and products into ChromaDB in large
+batches. It is built for catalogs with hundreds of thousands of records,
+where one embedding call and one commit per record is far too slow.
+
+Pipeline Stages:
+1. Read:
+   - .json files ({"tips": [...]}, {"faqs": [...]}, {"products": [...]})
+   - .ndjson / .jsonl files streamed line by line (one record per line)
+
+2. Batch + Hash:
+   - Records grouped into batch_size chunks
+   - content_hash (sha256 of document + metadata) stored in metadata
+
+3. Diff:
+   - Batches compared against stored hashes; unchanged records are skipped
+   - Makes re-running ingestion idempotent
+
+4. Embed:
+   - Changed documents embedded in a ProcessPoolExecutor
+   - Each worker loads its own DefaultEmbeddingFunction
+   - In-flight batches bounded to 2x workers (constant memory)
+   - workers=0 embeds in-process instead
+
+5. Upsert:
+   - One upsert per batch with precomputed embeddings
+
+Throughput:
+- Per-catalog read/upserted/unchanged/failed counts and docs/sec
+
+Usage Example:
+pipeline = IngestionPipeline(db_manager, batch_size=256, workers=4)
+pipeline.ingest("products", "data/health_knowledge/products.ndjson")
+pipeline.ingest_directory("data/health_knowledge")
+"""
@@ -1,52 +1,86 @@
+import argparse
 import json
 import os
-from chromadb_manager import ChromaDBManager
+import sys
+
+# Allow running as `python init_db.py` from this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.chromadb_manager import ChromaDBManager
+from database.ingestion import CATALOGS, IngestionPipeline
+from database.incremental_indexer import IncrementalIndexer
 
 def load_json_data(file_path):
     with open(file_path, 'r', encoding='utf-8') as file:
         return json.load(file)
 
-def init_database():
+def init_database(
+    batch_size: int = 256,
+    workers: int = None,
+    embedding_store: str = None,
+    import_snapshots: str = None,
+    export_snapshots: str = None,
+    incremental: bool = False
+):
     # Get the absolute path to the data directory
-    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     data_dir = os.path.join(base_dir, 'data')
     chroma_dir = os.path.join(data_dir, 'chromadb')
     
     # Create ChromaDB manager
-    db_manager = ChromaDBManager(chroma_dir)
+    db_manager = ChromaDBManager(chroma_dir, embedding_store_path=embedding_store)
+    
+    # Warm start: load catalogs with their stored embeddings before ingesting;
+    # unchanged records are then skipped by the content-hash check
+    if import_snapshots:
+        for name in CATALOGS:
+            path = os.path.join(import_snapshots, f"{name}.npz")
+            if os.path.exists(path):
+                db_manager.import_snapshot(path, name)
+    
+    if incremental:
+        # Only embed/upsert/delete records that changed since the last sync
+        indexer = IncrementalIndexer(db_manager, os.path.join(data_dir, 'health_knowledge'), batch_size=batch_size)
+        results = indexer.sync()
+    else:
+        # Stream health tips, FAQs and products (.json or .ndjson) in batches
+        pipeline = IngestionPipeline(db_manager, batch_size=batch_size, workers=workers)
+        results = pipeline.ingest_directory(os.path.join(data_dir, 'health_knowledge'))
     
-    # Load and insert health tips
-    tips_data = load_json_data(os.path.join(data_dir, 'health_knowledge', 'health_tips.json'))
-    for tip in tips_data['tips']:
-        db_manager.add_health_tip(
-            tip_id=tip['id'],
-            tip_text=tip['text'],
-            category=tip['category']
-        )
+    total_read = sum(result['read'] for result in results)
+    total_seconds = sum(result['seconds'] for result in results)
+    if total_seconds > 0:
+        print(f"Total: {total_read} records in {total_seconds:.2f}s ({total_read / total_seconds:.1f} docs/sec)")
     
-    # Load and insert FAQs
-    faqs_data = load_json_data(os.path.join(data_dir, 'health_knowledge', 'faqs.json'))
-    for faq in faqs_data['faqs']:
-        db_manager.add_faq(
-            faq_id=faq['id'],
-            question=faq['question'],
-            answer=faq['answer'],
-            category=faq['category']
-        )
+    # Publish a new shared embedding version; running workers pick it up without a restart
+    if embedding_store:
+        db_manager.export_embeddings()
     
-    # Load and insert products
-    products_data = load_json_data(os.path.join(data_dir, 'health_knowledge', 'products.json'))
-    for product in products_data['products']:
-        db_manager.add_product(
-            product_id=product['id'],
-            name=product['name'],
-            description=product['description'],
-            category=product['category'],
-            price=product['price']
-        )
+    if export_snapshots:
+        for name in CATALOGS:
+            db_manager.export_snapshot(name, os.path.join(export_snapshots, f"{name}.npz"))
+    
+    return results
 
 if __name__ == "__main__":
-    init_database()
+    parser = argparse.ArgumentParser(description="Load health knowledge catalogs into ChromaDB")
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--workers', type=int, default=None, help="Embedding processes (0 = in-process)")
+    parser.add_argument('--embedding-store', default=os.getenv('EMBEDDING_STORE_PATH'),
+                        help="Export catalog embeddings here for memory-mapped sharing")
+    parser.add_argument('--import-snapshots', default=None, help="Directory of <catalog>.npz snapshots to load first")
+    parser.add_argument('--export-snapshots', default=None, help="Write <catalog>.npz snapshots here afterwards")
+    parser.add_argument('--incremental', action='store_true', help="Apply only the diff against the index manifest")
+    args = parser.parse_args()
+    
+    init_database(
+        batch_size=args.batch_size,
+        workers=args.workers,
+        embedding_store=args.embedding_store,
+        import_snapshots=args.import_snapshots,
+        export_snapshots=args.export_snapshots,
+        incremental=args.incremental
+    )
     print("Database initialized successfully!")
 
 
@@ -68,9 +102,9 @@ FAQs, and product information.
 File Structure Required:
 data/
 ├── health_knowledge/
-│   ├── health_tips.json
-│   ├── faqs.json
-│   └── products.json
+│   ├── health_tips.json   (or health_tips.ndjson for large catalogs)
+│   ├── faqs.json          (or faqs.ndjson)
+│   └── products.json      (or products.ndjson)
 └── chromadb/
 
 JSON File Formats:
@@ -111,16 +145,23 @@ JSON File Formats:
     ]
 }
 
+NDJSON files contain one record object per line (no top-level key).
+
 Functions:
 - load_json_data(): Loads and parses JSON files
 - init_database(): Main initialization function that:
   1. Sets up ChromaDB manager
-  2. Loads JSON data
-  3. Populates database collections
+  2. Streams catalog files through IngestionPipeline
+  3. Embeds batches in a process pool and upserts changed records
+  4. Reports throughput (docs/sec)
+  5. Optionally exports embeddings to the shared memory-mapped store
+  6. Optionally imports (before) / exports (after) catalog snapshots, so a
+     new node loads stored embeddings instead of re-embedding everything
 
 Usage:
-python init_db.py
+python init_db.py [--batch-size 256] [--workers 4] [--embedding-store data/embeddings]
+                  [--import-snapshots DIR] [--export-snapshots DIR]
 
-Note: This script should be run once during initial setup or when
-resetting the database with default data.
-"""
\ No newline at end of file
+Note: Re-running is safe; records whose content hash is unchanged
+are skipped.
+"""
@@ -0,0 +1,156 @@
+# backend/database/lexical_index.py
+import heapq
+import math
+import re
+from typing import Dict, List, Optional, Tuple
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Function words that carry no signal for health/product lookups
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "for", "from",
+    "how", "i", "in", "is", "it", "me", "my", "of", "on", "or", "should", "so",
+    "that", "the", "this", "to", "what", "when", "which", "with", "you", "your"
+})
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased alphanumeric terms without stopwords"""
+    return [token for token in _TOKEN_PATTERN.findall((text or "").lower()) if token not in STOPWORDS]
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists: score(id) = sum of 1 / (k + rank) over the lists it appears in"""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, record_id in enumerate(ranking, start=1):
+            scores[record_id] = scores.get(record_id, 0.0) + 1.0 / (k + rank)
+    # Ties keep first-seen order, so the earlier ranking wins
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class BM25Index:
+    def __init__(self, name: str, k1: float = 1.5, b: float = 0.75):
+        self.name = name
+        self.k1 = k1
+        self.b = b
+        # term -> {record_id: term frequency}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        # record_id -> (document, metadata, terms, length)
+        self._records: Dict[str, Tuple[str, Dict, Dict[str, int], int]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add(self, ids: List[str], documents: Optional[List[Optional[str]]], metadatas: List[Optional[Dict]]):
+        """Insert or replace records; a None document keeps the previously indexed text"""
+        documents = documents or [None] * len(ids)
+        for record_id, document, metadata in zip(ids, documents, metadatas):
+            previous = self._records.get(record_id)
+            if document is None:
+                if previous is None:
+                    continue
+                document = previous[0]
+            self.remove([record_id])
+
+            terms: Dict[str, int] = {}
+            for token in tokenize(document):
+                terms[token] = terms.get(token, 0) + 1
+            length = sum(terms.values())
+            for term, frequency in terms.items():
+                self._postings.setdefault(term, {})[record_id] = frequency
+            self._records[record_id] = (document, metadata or {}, terms, length)
+            self._total_length += length
+
+    def remove(self, ids: List[str]):
+        for record_id in ids:
+            record = self._records.pop(record_id, None)
+            if record is None:
+                continue
+            for term in record[2]:
+                postings = self._postings.get(term, {})
+                postings.pop(record_id, None)
+                if not postings:
+                    self._postings.pop(term, None)
+            self._total_length -= record[3]
+
+    def _matches(self, metadata: Dict, where: Optional[Dict]) -> bool:
+        return not where or all(metadata.get(field) == value for field, value in where.items())
+
+    def search(self, query: str, limit: int = 5, where: Optional[Dict] = None) -> Dict:
+        """Top-k records by BM25 score; records sharing no term with the query are omitted"""
+        total = len(self._records)
+        if not total or limit <= 0:
+            return {'ids': [], 'documents': [], 'metadatas': [], 'scores': []}
+
+        average_length = self._total_length / total or 1.0
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1.0 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for record_id, frequency in postings.items():
+                length = self._records[record_id][3]
+                norm = self.k1 * (1.0 - self.b + self.b * length / average_length)
+                scores[record_id] = scores.get(record_id, 0.0) + idf * frequency * (self.k1 + 1.0) / (frequency + norm)
+
+        if where:
+            scores = {
+                record_id: score for record_id, score in scores.items()
+                if self._matches(self._records[record_id][1], where)
+            }
+
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], item[0]))
+        return {
+            'ids': [record_id for record_id, _ in top],
+            'documents': [self._records[record_id][0] for record_id, _ in top],
+            'metadatas': [self._records[record_id][1] for record_id, _ in top],
+            'scores': [score for _, score in top]
+        }
+
+    def get(self, record_id: str) -> Optional[Tuple[str, Dict]]:
+        record = self._records.get(record_id)
+        return (record[0], record[1]) if record else None
+
+
+
+"""
+BM25Index: In-Memory Lexical (Keyword) Index for Catalog Collections
+
+Health queries are full of exact terms ("melatonin", "magnesium glycinate",
+drug names) that sentence embeddings rank poorly. This module scores
+documents with Okapi BM25 over an inverted index so exact matches surface
+even at small k, and fuses those rankings with vector results.
+
+Key Features:
+1. Inverted Index:
+   - term -> {record_id: term frequency}
+   - Lower-cased alphanumeric tokens, common stopwords dropped
+   - Incremental add/remove; total length kept for avgdl
+
+2. Scoring (Okapi BM25):
+   - idf = ln(1 + (N - df + 0.5) / (df + 0.5))
+   - tf saturation k1 (default 1.5), length normalization b (default 0.75)
+   - Only postings of query terms are touched
+   - {field: value} metadata filters applied to the scored records
+
+3. Fusion:
+   - reciprocal_rank_fusion(rankings, k=60) merges ranked id lists
+   - Rank-based, so BM25 scores and L2 distances never need calibrating
+
+Output Format (same keys as the other in-memory indexes):
+{
+    'ids': [...],
+    'documents': [...],
+    'metadatas': [...],
+    'scores': [...]
+}
+
+Usage Example:
+index = BM25Index("products")
+index.add(ids, documents, metadatas)
+results = index.search("magnesium glycinate", limit=5)
+fused = reciprocal_rank_fusion([vector_ids, results['ids']])
+"""
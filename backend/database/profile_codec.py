@@ -0,0 +1,106 @@
+# backend/database/profile_codec.py
+import base64
+import json
+import zlib
+from typing import Dict, Iterable, List
+
+PROFILE_FORMAT_VERSION = 1
+
+# Known topic vocabulary; bit i of topic_bits is HEALTH_TOPICS[i].
+# Append-only: reordering or removing entries changes the meaning of stored bitsets.
+HEALTH_TOPICS = [
+    "sleep", "stress", "anxiety", "diet", "exercise",
+    "nutrition", "supplements", "meditation", "wellness"
+]
+_TOPIC_BITS = {topic: 1 << i for i, topic in enumerate(HEALTH_TOPICS)}
+
+# Chroma stores ints as signed 64-bit values
+assert len(HEALTH_TOPICS) < 63, "topic bitset must fit in a signed 64-bit metadata int"
+
+
+def encode_topics(topics: Iterable[str]) -> int:
+    """Pack known topics into a bitset (unknown topics are ignored)"""
+    bits = 0
+    for topic in topics:
+        bits |= _TOPIC_BITS.get(topic, 0)
+    return bits
+
+
+def decode_topics(bits: int) -> List[str]:
+    """Unpack a bitset into topics, in vocabulary order"""
+    return [topic for topic, bit in _TOPIC_BITS.items() if bits & bit]
+
+
+def topic_overlap(bits_a: int, bits_b: int) -> int:
+    """Number of topics two bitsets share"""
+    return bin(bits_a & bits_b).count("1")
+
+
+def encode_profile(profile: Dict) -> Dict:
+    """Flatten a profile into Chroma-compatible metadata (scalars only)"""
+    topics = profile.get("key_topics") or []
+    rest = {key: value for key, value in profile.items() if key not in ("user_id", "key_topics", "topic_bits")}
+    # Topics outside the vocabulary still round-trip through the blob
+    extra_topics = [topic for topic in topics if topic not in _TOPIC_BITS]
+    if extra_topics:
+        rest["extra_topics"] = extra_topics
+
+    packed = json.dumps(rest, separators=(",", ":"), sort_keys=True, default=str).encode("utf-8")
+    return {
+        "user_id": profile.get("user_id", ""),
+        "profile_v": PROFILE_FORMAT_VERSION,
+        "topic_bits": encode_topics(topics),
+        "profile_blob": base64.b64encode(zlib.compress(packed)).decode("ascii")
+    }
+
+
+def decode_profile(metadata: Dict) -> Dict:
+    """Inverse of encode_profile; metadata written before encoding is returned as-is"""
+    if "profile_v" not in metadata:
+        return dict(metadata)
+
+    version = metadata["profile_v"]
+    if version != PROFILE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported profile format version: {version}")
+
+    rest = json.loads(zlib.decompress(base64.b64decode(metadata["profile_blob"])).decode("utf-8"))
+    extra_topics = rest.pop("extra_topics", [])
+    profile = {
+        "user_id": metadata.get("user_id", ""),
+        "key_topics": decode_topics(metadata.get("topic_bits", 0)) + extra_topics,
+        "topic_bits": metadata.get("topic_bits", 0)
+    }
+    profile.update(rest)
+    return profile
+
+
+
+"""
+Profile Codec: Compact Storage Encoding for User Profiles
+
+User profiles contain lists (key_topics, health_concerns) and a nested dict
+(preferences), which Chroma metadata cannot store. This module flattens a
+profile into four scalar metadata fields.
+
+Stored Metadata (format version 1):
+{
+    "user_id": str,        # kept as a scalar so it stays filterable
+    "profile_v": 1,        # format version
+    "topic_bits": int,     # bitset over HEALTH_TOPICS
+    "profile_blob": str    # base64(zlib(compact JSON of every other field))
+}
+
+Topic Bitset:
+- Bit i set means HEALTH_TOPICS[i] is one of the user's key topics
+- HEALTH_TOPICS is append-only so stored bitsets keep their meaning
+- topic_overlap(a, b) compares two users/queries with a single AND + popcount
+- Topics outside the vocabulary are kept in the blob as extra_topics
+
+Decoded profiles carry topic_bits alongside key_topics so callers can use
+bitwise comparisons without re-encoding.
+
+Usage Example:
+metadata = encode_profile(profile)
+profile = decode_profile(metadata)
+shared = topic_overlap(profile["topic_bits"], encode_topics(["sleep", "stress"]))
+"""
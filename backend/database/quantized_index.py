@@ -0,0 +1,249 @@
+# backend/database/quantized_index.py
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Rows decoded per block during a scan; bounds the float32 scratch memory
+SCAN_BLOCK_ROWS = 16384
+
+
+def squared_distances(points: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Pairwise squared L2 distances, shape (len(points), len(centroids))"""
+    return (
+        np.einsum('ij,ij->i', points, points)[:, None]
+        - 2.0 * (points @ centroids.T)
+        + np.einsum('ij,ij->i', centroids, centroids)[None, :]
+    )
+
+
+def kmeans(points: np.ndarray, k: int, iterations: int = 20, seed: int = 0, max_points_per_centroid: int = 64) -> np.ndarray:
+    """Plain Lloyd's k-means; empty clusters are re-seeded from random points"""
+    rng = np.random.default_rng(seed)
+    k = min(k, len(points))
+    if len(points) > k * max_points_per_centroid:
+        points = points[rng.choice(len(points), size=k * max_points_per_centroid, replace=False)]
+    centroids = points[rng.choice(len(points), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = squared_distances(points, centroids).argmin(axis=1)
+        # Per-cluster sums via one sort + reduceat (much faster than np.add.at)
+        order = np.argsort(assignment, kind='stable')
+        sizes = np.bincount(assignment, minlength=k)
+        present = np.flatnonzero(sizes)
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])[present]
+        centroids[present] = np.add.reduceat(points[order], starts, axis=0) / sizes[present, None]
+        empty = sizes == 0
+        if empty.any():
+            centroids[empty] = points[rng.choice(len(points), size=int(empty.sum()), replace=False)]
+    return centroids
+
+
+class QuantizedVectorIndex:
+    METHODS = ("sq8", "pq")
+
+    def __init__(
+        self,
+        name: str,
+        method: str = "sq8",
+        nlist: int = 0,
+        nprobe: int = 8,
+        pq_subvectors: int = 96,
+        train_size: int = 50000,
+        seed: int = 0
+    ):
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown quantization method: {method}")
+        self.name = name
+        self.method = method
+        # nlist=0 scans every code; otherwise only the nprobe closest inverted lists
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.pq_subvectors = pq_subvectors
+        self.train_size = train_size
+        self.seed = seed
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self.ids: List[str] = []
+        self.dimension = 0
+        self.codes = np.zeros((0, 0), dtype=np.uint8)
+        # sq8: per-dimension offset/scale and reconstructed squared norms
+        self._offset = np.zeros(0, dtype=np.float32)
+        self._scale = np.zeros(0, dtype=np.float32)
+        self._norms = np.zeros(0, dtype=np.float32)
+        # pq: (subvectors, centroids, sub_dimension) codebooks
+        self._codebooks = np.zeros((0, 0, 0), dtype=np.float32)
+        # ivf: coarse centroids and row ranges; rows are stored grouped by list
+        self._coarse = np.zeros((0, 0), dtype=np.float32)
+        self._list_offsets = np.zeros(1, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _training_sample(self, vectors: np.ndarray) -> np.ndarray:
+        if len(vectors) <= self.train_size:
+            return vectors
+        rng = np.random.default_rng(self.seed)
+        return vectors[rng.choice(len(vectors), size=self.train_size, replace=False)]
+
+    def build(self, ids: List[str], embeddings):
+        """Train the quantizer on a full snapshot of a collection and encode every vector"""
+        vectors = np.ascontiguousarray(np.asarray(embeddings, dtype=np.float32))
+        if len(ids) == 0:
+            with self._lock:
+                self._clear()
+            return
+
+        sample = self._training_sample(vectors)
+        order = np.arange(len(ids))
+        coarse = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+        list_offsets = np.array([0, len(ids)], dtype=np.int64)
+        if self.nlist > 0:
+            coarse = kmeans(sample, self.nlist, seed=self.seed)
+            assignment = np.concatenate([
+                squared_distances(vectors[start:start + SCAN_BLOCK_ROWS], coarse).argmin(axis=1)
+                for start in range(0, len(vectors), SCAN_BLOCK_ROWS)
+            ])
+            order = np.argsort(assignment, kind='stable')
+            list_offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=len(coarse)))])
+        vectors = vectors[order]
+
+        if self.method == "sq8":
+            low, high = sample.min(axis=0), sample.max(axis=0)
+            scale = np.where(high > low, (high - low) / 255.0, 1.0).astype(np.float32)
+            codes = np.clip(np.rint((vectors - low) / scale), 0, 255).astype(np.uint8)
+            decoded = codes.astype(np.float32) * scale + low
+            norms = np.einsum('ij,ij->i', decoded, decoded).astype(np.float32)
+            codebooks = np.zeros((0, 0, 0), dtype=np.float32)
+        else:
+            # Largest subvector count up to pq_subvectors that divides the dimension
+            subvectors = max(m for m in range(1, self.pq_subvectors + 1) if vectors.shape[1] % m == 0)
+            sub_dimension = vectors.shape[1] // subvectors
+            codebooks = np.stack([
+                kmeans(sample[:, j * sub_dimension:(j + 1) * sub_dimension], 256, iterations=10, seed=self.seed + j)
+                for j in range(subvectors)
+            ]).astype(np.float32)
+            codes = np.empty((len(vectors), subvectors), dtype=np.uint8)
+            for j in range(subvectors):
+                part = vectors[:, j * sub_dimension:(j + 1) * sub_dimension]
+                for start in range(0, len(part), SCAN_BLOCK_ROWS):
+                    block = part[start:start + SCAN_BLOCK_ROWS]
+                    codes[start:start + len(block), j] = squared_distances(block, codebooks[j]).argmin(axis=1)
+            low = scale = norms = np.zeros(0, dtype=np.float32)
+
+        with self._lock:
+            self.ids = [ids[i] for i in order]
+            self.dimension = vectors.shape[1]
+            self.codes = np.ascontiguousarray(codes)
+            self._offset, self._scale, self._norms = low.astype(np.float32), scale, norms
+            self._codebooks = codebooks
+            self._coarse = coarse
+            self._list_offsets = list_offsets
+
+    def _query_state(self, query: np.ndarray):
+        """Per-query terms shared by every scanned range"""
+        if self.method == "sq8":
+            # x_hat . q = codes . (scale * q) + offset . q
+            return query * self._scale, float(self._offset @ query)
+        # Asymmetric distance: per-subvector lookup tables against the query
+        subvectors, _, sub_dimension = self._codebooks.shape
+        parts = query.reshape(subvectors, 1, sub_dimension)
+        return ((self._codebooks - parts) ** 2).sum(axis=2) - (parts[:, 0] ** 2).sum(axis=1)[:, None]
+
+    def _approximate_distances(self, state, start: int, end: int) -> np.ndarray:
+        """Squared L2 distance estimates for rows [start, end), up to the constant ||q||^2"""
+        if self.method == "sq8":
+            weighted, bias = state
+            distances = np.empty(end - start, dtype=np.float32)
+            for block in range(start, end, SCAN_BLOCK_ROWS):
+                stop = min(block + SCAN_BLOCK_ROWS, end)
+                dots = self.codes[block:stop].astype(np.float32) @ weighted + bias
+                distances[block - start:stop - start] = self._norms[block:stop] - 2.0 * dots
+            return distances
+
+        tables = state
+        return tables[np.arange(len(tables)), self.codes[start:end]].sum(axis=1)
+
+    def search(self, query_embedding, limit: int = 5) -> Dict:
+        """Approximate top-k ids (re-score these against full vectors for exact order)"""
+        with self._lock:
+            if not self.ids or limit <= 0:
+                return {'ids': [], 'distances': []}
+
+            query = np.asarray(query_embedding, dtype=np.float32)
+            if len(self._coarse):
+                probes = np.argsort(squared_distances(query[None, :], self._coarse)[0])[:self.nprobe]
+                ranges = [(int(self._list_offsets[p]), int(self._list_offsets[p + 1])) for p in probes]
+            else:
+                ranges = [(0, len(self.ids))]
+            ranges = [(start, end) for start, end in ranges if end > start]
+            if not ranges:
+                return {'ids': [], 'distances': []}
+
+            rows = np.concatenate([np.arange(start, end) for start, end in ranges])
+            state = self._query_state(query)
+            distances = np.concatenate([self._approximate_distances(state, start, end) for start, end in ranges])
+
+            k = min(limit, len(rows))
+            top = np.argpartition(distances, k - 1)[:k] if k < len(rows) else np.arange(len(rows))
+            top = top[np.argsort(distances[top], kind='stable')]
+            return {
+                'ids': [self.ids[i] for i in rows[top]],
+                'distances': [float(d) + float(query @ query) for d in distances[top]]
+            }
+
+    @property
+    def nbytes(self) -> int:
+        """Resident size of the codes and quantizer state (ids excluded)"""
+        return int(
+            self.codes.nbytes + self._offset.nbytes + self._scale.nbytes + self._norms.nbytes
+            + self._codebooks.nbytes + self._coarse.nbytes + self._list_offsets.nbytes
+        )
+
+    @property
+    def bytes_per_vector(self) -> float:
+        return self.nbytes / len(self.ids) if self.ids else 0.0
+
+
+
+"""
+QuantizedVectorIndex: Compressed Approximate Index for Large Catalogs
+
+Float32 embeddings cost 4 bytes per dimension (1.5 KB per 384-d vector) in
+every worker. This class keeps only compressed codes in memory and returns
+approximate candidates, which ChromaDBManager re-scores exactly against the
+stored float32 embeddings of those few candidates.
+
+Key Features:
+1. Quantizers:
+   - sq8: per-dimension min/max scalar quantization to uint8 (~4x smaller)
+     Dot products computed as codes . (scale * q) + offset . q
+   - pq: product quantization, m subvectors x 256 k-means centroids,
+     one byte per subvector (384-d with m=96: 96 bytes, ~15x smaller)
+     Distances from per-query lookup tables (asymmetric distance)
+
+2. Inverted File (optional, nlist > 0):
+   - Coarse k-means centroids partition the vectors
+   - Rows stored grouped by list; a search scans only the nprobe closest lists
+
+3. Training:
+   - k-means / min-max fit on a random sample of up to train_size vectors
+   - Encoding and scans run in blocks of SCAN_BLOCK_ROWS rows
+
+4. Refresh:
+   - build() retrains on a full snapshot (same lifecycle as InMemoryVectorIndex)
+
+Output Format:
+{
+    'ids': [...],        # approximate nearest first
+    'distances': [...]   # approximate squared L2 distances
+}
+
+Usage Example:
+index = QuantizedVectorIndex("products", method="sq8", nlist=256, nprobe=16)
+index.build(ids, embeddings)
+candidates = index.search(query_embedding, limit=40)
+
+See benchmark_index.py for recall@k vs memory/latency measurements.
+"""
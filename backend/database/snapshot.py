@@ -0,0 +1,103 @@
+# backend/database/snapshot.py
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+SNAPSHOT_SCHEMA_VERSION = 1
+
+
+def _checksum(ids: np.ndarray, documents: np.ndarray, metadatas: np.ndarray, embeddings: np.ndarray) -> str:
+    digest = hashlib.sha256()
+    for array in (ids, documents, metadatas, embeddings):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def write_snapshot(
+    path: str,
+    collection: str,
+    ids: List[str],
+    documents: List[Optional[str]],
+    metadatas: List[Optional[Dict]],
+    embeddings,
+    embedding_function: str
+) -> Dict:
+    """Write a collection snapshot as a compressed, checksummed .npz file"""
+    arrays = {
+        "ids": np.array(ids, dtype=str),
+        "documents": np.array([document or "" for document in documents], dtype=str),
+        # Metadata values are scalars, so one JSON string per record keeps the file pickle-free
+        "metadatas": np.array([json.dumps(metadata or {}, sort_keys=True) for metadata in metadatas], dtype=str),
+        "embeddings": np.ascontiguousarray(np.asarray(embeddings, dtype=np.float32)).reshape(len(ids), -1),
+    }
+    manifest = {
+        "schema_version": SNAPSHOT_SCHEMA_VERSION,
+        "collection": collection,
+        "count": len(ids),
+        "dimension": int(arrays["embeddings"].shape[1]),
+        "embedding_function": embedding_function,
+        "created_at": time.time(),
+        "checksum": _checksum(**arrays)
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as file:
+        np.savez_compressed(file, manifest=np.array(json.dumps(manifest)), **arrays)
+    os.replace(tmp_path, path)
+    return manifest
+
+
+def read_snapshot(path: str) -> Dict:
+    """Load and verify a snapshot; raises ValueError if it is corrupt or from another schema"""
+    with np.load(path, allow_pickle=False) as data:
+        manifest = json.loads(str(data["manifest"]))
+        if manifest.get("schema_version") != SNAPSHOT_SCHEMA_VERSION:
+            raise ValueError(f"Unsupported snapshot schema version: {manifest.get('schema_version')}")
+        arrays = {key: data[key] for key in ("ids", "documents", "metadatas", "embeddings")}
+
+    if _checksum(**arrays) != manifest["checksum"]:
+        raise ValueError(f"Snapshot checksum mismatch: {path}")
+
+    return {
+        "manifest": manifest,
+        "ids": [str(record_id) for record_id in arrays["ids"]],
+        "documents": [str(document) for document in arrays["documents"]],
+        "metadatas": [json.loads(str(metadata)) for metadata in arrays["metadatas"]],
+        "embeddings": arrays["embeddings"]
+    }
+
+
+
+"""
+Collection Snapshots: Portable Export/Import Without Re-Embedding
+
+Provisioning a node by re-ingesting health_tips and products runs ONNX
+inference over every document. A snapshot carries the stored embeddings
+along with ids, documents and metadata so another node can bulk-load the
+catalog with file I/O only.
+
+File Format (.npz, compressed, loadable without pickle):
+- ids         fixed-width unicode array
+- documents   fixed-width unicode array
+- metadatas   one JSON object string per record
+- embeddings  float32 matrix (rows = records)
+- manifest    JSON: schema_version, collection, count, dimension,
+              embedding_function, created_at, checksum
+
+Integrity:
+- checksum is sha256 over the raw bytes of the four arrays
+- read_snapshot() rejects other schema versions and checksum mismatches
+- ChromaDBManager.import_snapshot() also refuses snapshots embedded by a
+  different embedding function (the vectors would not be comparable)
+
+Writes go to a temporary file that is renamed into place.
+
+Usage Example:
+manifest = write_snapshot("products.npz", "products", ids, documents, metadatas, embeddings, "default")
+snapshot = read_snapshot("products.npz")
+"""
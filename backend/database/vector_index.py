@@ -0,0 +1,140 @@
+# backend/database/vector_index.py
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class InMemoryVectorIndex:
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self.ids: List[str] = []
+        self.documents: List[str] = []
+        self.metadatas: List[Dict] = []
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.squared_norms = np.zeros(0, dtype=np.float32)
+        self._field_arrays: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def build(
+        self,
+        ids: List[str],
+        embeddings,
+        documents: List[str],
+        metadatas: List[Optional[Dict]]
+    ):
+        """Replace the index contents with a full snapshot of a collection"""
+        matrix = np.ascontiguousarray(np.asarray(embeddings, dtype=np.float32))
+        if len(ids) == 0:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+
+        with self._lock:
+            self.ids = list(ids)
+            self.documents = list(documents)
+            self.metadatas = [metadata or {} for metadata in metadatas]
+            self.matrix = matrix
+            self.squared_norms = np.einsum('ij,ij->i', matrix, matrix) if len(ids) else np.zeros(0, dtype=np.float32)
+            self._field_arrays = {}
+
+    def _field_array(self, field: str) -> np.ndarray:
+        """Column of metadata values used for boolean-mask filtering"""
+        if field not in self._field_arrays:
+            self._field_arrays[field] = np.array(
+                [metadata.get(field) for metadata in self.metadatas],
+                dtype=object
+            )
+        return self._field_arrays[field]
+
+    def _mask(self, where: Optional[Dict]) -> Optional[np.ndarray]:
+        """Boolean mask for simple {field: value} equality filters"""
+        if not where:
+            return None
+        mask = np.ones(len(self.ids), dtype=bool)
+        for field, value in where.items():
+            mask &= self._field_array(field) == value
+        return mask
+
+    def search(self, query_embedding, limit: int = 5, where: Optional[Dict] = None) -> Dict:
+        """Exact top-k by L2 distance (same ordering as Chroma's default space)"""
+        with self._lock:
+            if not self.ids or limit <= 0:
+                return {'ids': [], 'documents': [], 'metadatas': [], 'distances': []}
+
+            query = np.asarray(query_embedding, dtype=np.float32)
+            # ||x - q||^2 = ||x||^2 - 2 x.q + ||q||^2; the last term is constant per query
+            distances = self.squared_norms - 2.0 * (self.matrix @ query) + float(query @ query)
+
+            candidates = np.arange(len(self.ids))
+            mask = self._mask(where)
+            if mask is not None:
+                candidates = candidates[mask]
+                distances = distances[mask]
+
+            k = min(limit, len(candidates))
+            if k == 0:
+                return {'ids': [], 'documents': [], 'metadatas': [], 'distances': []}
+            if k < len(candidates):
+                top = np.argpartition(distances, k - 1)[:k]
+            else:
+                top = np.arange(len(candidates))
+            top = top[np.argsort(distances[top], kind='stable')]
+            rows = candidates[top]
+
+            return {
+                'ids': [self.ids[i] for i in rows],
+                'documents': [self.documents[i] for i in rows],
+                'metadatas': [self.metadatas[i] for i in rows],
+                'distances': [float(d) for d in distances[top]]
+            }
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.matrix.nbytes + self.squared_norms.nbytes)
+
+
+
+"""
+InMemoryVectorIndex: In-Process Exact Vector Search for Small Catalogs
+
+This class mirrors a small, rarely-changing ChromaDB collection (health_tips,
+products) as a contiguous float32 matrix so top-k retrieval is a single
+vectorized matrix-vector product instead of a round-trip through Chroma's
+SQLite + HNSW stack.
+
+Key Features:
+1. Storage:
+   - Contiguous float32 embedding matrix (rows = records)
+   - Precomputed squared norms
+   - Parallel id / document / metadata lists
+
+2. Search:
+   - Exact L2 distances, matching Chroma's default "l2" space
+   - argpartition for top-k, argsort only over the k winners
+   - {field: value} filters applied as boolean masks over metadata columns
+
+3. Refresh:
+   - build() swaps in a full snapshot of the collection
+   - ChromaDBManager marks the mirror stale on writes and rebuilds lazily
+
+Output Format (same keys as a single Chroma query row):
+{
+    'ids': [...],
+    'documents': [...],
+    'metadatas': [...],
+    'distances': [...]
+}
+
+Usage Example:
+index = InMemoryVectorIndex("products")
+index.build(ids, embeddings, documents, metadatas)
+results = index.search(query_embedding, limit=5, where={"category": "sleep"})
+
+Note: Intended for catalogs up to ~100k rows; larger collections should
+stay on Chroma's ANN index.
+"""
@@ -0,0 +1,227 @@
+# backend/database/write_behind.py
+import json
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class WriteBehindQueue:
+    def __init__(
+        self,
+        db_manager,
+        batch_size: int = 64,
+        flush_interval: float = 1.0,
+        max_queue_size: int = 10000,
+        put_timeout: float = 0.5,
+        spill_path: Optional[str] = None
+    ):
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.spill_path = spill_path
+
+        self._queue: "queue.Queue[Dict]" = queue.Queue(maxsize=max_queue_size)
+        self._journal_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+        self.stats = {
+            "submitted": 0,
+            "written": 0,
+            "batches": 0,
+            "sync_fallbacks": 0,
+            "replayed": 0,
+            "errors": 0
+        }
+
+    def start(self):
+        """Replay any records left by a crash, then start the background writer"""
+        if self._worker and self._worker.is_alive():
+            return
+        self._replay_spill_file()
+        self._stop.clear()
+        self._worker = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._worker.start()
+
+    def submit(self, record: Dict) -> bool:
+        """Queue a record ({collection, id, document, metadata}) for a batched write"""
+        try:
+            with self._journal_lock:
+                self._append_to_spill_file(record)
+                # Backpressure: wait briefly for room, then write inline rather than drop
+                self._queue.put(record, timeout=self.put_timeout)
+            self.stats["submitted"] += 1
+            return True
+
+        except queue.Full:
+            print("Write-behind queue full, writing record synchronously")
+            self.stats["sync_fallbacks"] += 1
+            return self._write_batch([record])
+
+        except Exception as e:
+            print(f"Error queueing record: {str(e)}")
+            return False
+
+    def flush(self):
+        """Write everything currently queued (used on shutdown)"""
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                break
+            self._write_batch(batch)
+        self._truncate_spill_file_if_idle()
+
+    def close(self, timeout: float = 10.0):
+        """Stop the writer thread and flush remaining records"""
+        self._stop.set()
+        if self._worker:
+            self._worker.join(timeout=timeout)
+        self.flush()
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect_batch()
+            if batch:
+                self._write_batch(batch)
+                self._truncate_spill_file_if_idle()
+
+    def _collect_batch(self) -> List[Dict]:
+        """Block for the first record, then gather until batch_size or flush_interval"""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self, limit: int) -> List[Dict]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(self, batch: List[Dict]) -> bool:
+        """One upsert per collection; upsert keeps replays idempotent"""
+        grouped: Dict[str, List[Dict]] = {}
+        for record in batch:
+            grouped.setdefault(record["collection"], []).append(record)
+
+        success = True
+        for collection_name, records in grouped.items():
+            try:
+                self.db_manager._upsert(
+                    collection_name,
+                    documents=[record["document"] for record in records],
+                    metadatas=[record["metadata"] for record in records],
+                    ids=[record["id"] for record in records]
+                )
+                self.stats["written"] += len(records)
+                self.stats["batches"] += 1
+            except Exception as e:
+                # Records stay in the spill file and are replayed on next start
+                print(f"Error writing batch to {collection_name}: {str(e)}")
+                self.stats["errors"] += 1
+                success = False
+        return success
+
+    def _append_to_spill_file(self, record: Dict):
+        if not self.spill_path:
+            return
+        with open(self.spill_path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(record) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def _truncate_spill_file_if_idle(self):
+        """Clear the journal once every journaled record has been committed"""
+        if not self.spill_path or self.stats["errors"]:
+            return
+        with self._journal_lock:
+            if self._queue.empty() and os.path.exists(self.spill_path):
+                open(self.spill_path, 'w').close()
+
+    def _replay_spill_file(self):
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return
+        try:
+            records = []
+            with open(self.spill_path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # Partial line from a crash mid-write
+                        continue
+
+            for start in range(0, len(records), self.batch_size):
+                self._write_batch(records[start:start + self.batch_size])
+            self.stats["replayed"] = len(records)
+            if records:
+                print(f"Replayed {len(records)} unflushed records from {self.spill_path}")
+            self._truncate_spill_file_if_idle()
+
+        except Exception as e:
+            print(f"Error replaying spill file: {str(e)}")
+
+
+
+"""
+WriteBehindQueue: Background Group-Commit Writer for Chat and Feedback Records
+
+This class takes chat history and feedback storage off the response latency
+path. Request handlers enqueue records; a background thread embeds and
+writes them to ChromaDB in batched upserts, turning many single-record
+commits into a few large ones.
+
+Key Features:
+1. Group Commit:
+   - Flushes when batch_size records are waiting or flush_interval elapses
+   - One upsert per collection per batch (one embedding call per batch)
+
+2. Backpressure:
+   - Bounded queue (max_queue_size)
+   - submit() waits up to put_timeout, then writes inline instead of dropping
+
+3. Durability:
+   - Every record is appended (and fsynced) to an NDJSON spill file first
+   - Spill file is truncated once the queue has fully drained
+   - Leftover records are replayed on start(); upserts make replay idempotent
+
+4. Shutdown:
+   - close() stops the worker and flushes whatever is still queued
+
+Record Format:
+{
+    "collection": "chat_history" | "feedback",
+    "id": "unique record id",
+    "document": "text to embed",
+    "metadata": {...}
+}
+
+Usage Example:
+writer = WriteBehindQueue(db_manager, spill_path="data/chromadb/write_behind.ndjson")
+writer.start()
+writer.submit(record)
+writer.close()
+"""
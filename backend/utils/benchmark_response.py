@@ -0,0 +1,102 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+# Allow running as `python benchmark_response.py` from this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from utils.response_generator import ResponseGenerator
+
+SAMPLE_QUERIES = [
+    "Is melatonin safe to take every night?",
+    "What are the side effects of ashwagandha?",
+    "How much water should I drink a day?",
+    "Can magnesium help with sleep?",
+    "Is intermittent fasting good for blood sugar?",
+]
+
+SAMPLE_RAG_CONTEXT = """Health Tip: Aim for 7-9 hours of sleep each night for optimal health.
+Health Tip: Stay hydrated by drinking at least 8 glasses of water daily.
+Product: Sleep Support Supplement - Natural supplement with Melatonin and Magnesium for better sleep.
+Product: Stress Relief Tea - Herbal tea blend for relaxation and better sleep."""
+
+SAMPLE_RESEARCH = (
+    "Key findings: short-term use is generally well tolerated in healthy adults; evidence for long-term "
+    "use is limited. Safety warnings: may interact with sedatives, anticoagulants and blood pressure "
+    "medication; not recommended during pregnancy. Scientific consensus: modest benefit, dose-dependent "
+    "side effects (headache, drowsiness, GI upset). References: several randomized controlled trials and "
+    "a 2022 systematic review."
+)
+
+def load_queries(path: str):
+    with open(path, 'r', encoding='utf-8') as file:
+        return [line.strip() for line in file if line.strip()]
+
+async def run_mode(generator: ResponseGenerator, mode: str, queries, with_research: bool):
+    latencies = []
+    for query in queries:
+        research = {f"What are the risks of {query}": SAMPLE_RESEARCH} if with_research else {}
+        started = time.perf_counter()
+        await generator.generate_response(
+            original_query=query,
+            sub_queries=list(research),
+            research_results=research,
+            rag_context=SAMPLE_RAG_CONTEXT,
+            mode=mode
+        )
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+async def benchmark(queries, modes, repeats: int, with_research: bool):
+    generator = ResponseGenerator(Config.GOOGLE_API_KEY)
+    latencies = {mode: [] for mode in modes}
+    for repeat in range(repeats):
+        # Alternate the order so neither mode always runs on a warm connection
+        for mode in (modes if repeat % 2 == 0 else list(reversed(modes))):
+            latencies[mode].extend(await run_mode(generator, mode, queries, with_research))
+
+    print(f"{len(queries)} queries x {repeats} repeats, research context: {with_research}")
+    print(f"{'mode':<14}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'calls':>8}{'prompt tok':>12}{'output tok':>12}")
+    for mode in modes:
+        usage = generator.usage[mode]
+        responses = max(usage["responses"], 1)
+        values = np.array(latencies[mode])
+        print(
+            f"{mode:<14}{values.mean():>10.0f}{np.percentile(values, 50):>10.0f}{np.percentile(values, 95):>10.0f}"
+            f"{usage['requests'] / responses:>8.1f}{usage['prompt_tokens'] / responses:>12.0f}"
+            f"{usage['output_tokens'] / responses:>12.0f}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare latency and tokens of two-pass and single-pass response generation")
+    parser.add_argument('--queries', help="file with one query per line (default: built-in samples)")
+    parser.add_argument('--repeats', type=int, default=2)
+    parser.add_argument('--modes', nargs='+', default=list(ResponseGenerator.MODES), choices=ResponseGenerator.MODES)
+    parser.add_argument('--no-research', action='store_true', help="benchmark without research findings in the context")
+    args = parser.parse_args()
+
+    if not Config.GOOGLE_API_KEY:
+        sys.exit("GOOGLE_API_KEY is not set")
+    queries = load_queries(args.queries) if args.queries else SAMPLE_QUERIES
+    asyncio.run(benchmark(queries, args.modes, args.repeats, not args.no_research))
+
+
+
+"""
+Response Generation Benchmark: two_pass vs single_pass
+
+Runs ResponseGenerator against the real Gemini Pro model in each mode with
+the same queries and a representative RAG + research context, and reports
+per-response latency (mean / p50 / p95), Gemini requests, and prompt and
+output tokens (from usage_metadata).
+
+Usage:
+python benchmark_response.py [--queries queries.txt] [--repeats 2] [--modes two_pass single_pass] [--no-research]
+
+Requires GOOGLE_API_KEY. Modes alternate order on each repeat.
+"""
@@ -1,4 +1,5 @@
 # backend/utils/gemini_handler.py
+import asyncio
 import google.generativeai as genai
 from typing import Dict, List, Optional
 from utils.rag_handler import RAGHandler
@@ -7,6 +8,10 @@ from utils.search_controller import SearchController
 from utils.response_generator import ResponseGenerator
 from utils.context_manager import ContextManager
 from utils.user_profile_manager import UserProfileManager
+from utils.stage_graph import StageGraph
+from utils.research_classifier import ResearchClassifier
+from utils.semantic_cache import SemanticCache
+from utils.research_cache import ResearchCache
 
 class GeminiHandler:
     def __init__(self, config):
@@ -15,19 +20,69 @@ class GeminiHandler:
         
         # Initialize components
         self.query_decomposer = QueryDecomposer(config.GOOGLE_API_KEY)
-        self.search_controller = SearchController(config.SONAR_API_KEY)
+        research_cache = None
+        if config.RESEARCH_CACHE_ENABLED:
+            research_cache = ResearchCache(
+                config.RESEARCH_CACHE_PATH,
+                ttl=config.RESEARCH_CACHE_TTL,
+                stale_ttl=config.RESEARCH_CACHE_STALE_TTL,
+                max_entries=config.RESEARCH_CACHE_MAX_ENTRIES,
+                namespace=config.SONAR_MODEL
+            )
+        self.search_controller = SearchController(config.SONAR_API_KEY, cache=research_cache)
         self.response_generator = ResponseGenerator(config.GOOGLE_API_KEY)
         self.rag_handler = None
         self.context_manager = ContextManager()
         self.user_profile_manager = None
+        self.db_manager = None
+        self.answer_cache = None
         
         # Initialize chat sessions
         self.chat_sessions: Dict[str, any] = {}
 
-    def set_managers(self, db_manager):
+    def set_managers(self, db_manager, async_db_manager=None):
         """Set RAG handler and User Profile Manager"""
+        self.db_manager = db_manager
         self.rag_handler = RAGHandler(db_manager)
-        self.user_profile_manager = UserProfileManager(db_manager)
+        self.user_profile_manager = UserProfileManager(
+            db_manager,
+            cache_size=self.config.PROFILE_CACHE_SIZE,
+            touch_interval=self.config.PROFILE_TOUCH_INTERVAL,
+            async_db_manager=async_db_manager
+        )
+        if self.config.RESEARCH_CLASSIFIER_ENABLED:
+            # Reuses the cached catalog embedder, so triage costs one local embedding
+            classifier = ResearchClassifier(
+                db_manager.embedding_function,
+                model_path=self.config.RESEARCH_CLASSIFIER_PATH,
+                log_path=self.config.RESEARCH_LOG_PATH,
+                threshold=self.config.RESEARCH_CLASSIFIER_THRESHOLD,
+                min_examples=self.config.RESEARCH_CLASSIFIER_MIN_EXAMPLES
+            )
+            self.query_decomposer.set_classifier(classifier)
+        if self.config.DECOMPOSITION_CACHE_ENABLED:
+            self.query_decomposer.set_cache(SemanticCache(
+                db_manager.embedding_function,
+                threshold=self.config.DECOMPOSITION_CACHE_THRESHOLD,
+                ttl=self.config.DECOMPOSITION_CACHE_TTL,
+                max_entries=self.config.DECOMPOSITION_CACHE_SIZE,
+                name="decomposition"
+            ))
+        if self.config.ANSWER_CACHE_ENABLED:
+            self.answer_cache = SemanticCache(
+                db_manager.embedding_function,
+                threshold=self.config.ANSWER_CACHE_THRESHOLD,
+                ttl=self.config.ANSWER_CACHE_TTL,
+                max_entries=self.config.ANSWER_CACHE_SIZE,
+                name="answer"
+            )
+
+    @staticmethod
+    def _is_personalized(user_profile: Optional[Dict]) -> bool:
+        """Profiles with a summary, topics or concerns change the answer, so it must not be shared"""
+        return bool(user_profile and (
+            user_profile.get('summary') or user_profile.get('key_topics') or user_profile.get('health_concerns')
+        ))
 
     async def get_response(
         self, 
@@ -41,56 +96,89 @@ class GeminiHandler:
             print(f"Original Message: {message}")
             print(f"Platform: {'WhatsApp' if is_whatsapp else 'Streamlit'}")
             
-            # Get user profile for WhatsApp users
-            user_profile = None
-            if is_whatsapp and self.user_profile_manager:
-                user_profile = await self.user_profile_manager.get_user_profile(user_id)
-            
             # Get session context
             context = self.context_manager.get_context(user_id)
             print(f"Retrieved context length: {len(context)}")
             
-            # Step 1: Decompose query and check if research needed
-            decomposition_result = self.query_decomposer.decompose_query(message)
-            needs_research = decomposition_result['needs_research']
-            sub_queries = decomposition_result['sub_queries']
+            # Answer cache: a near-duplicate of an earlier non-personalized question
+            # skips the whole pipeline. The profile is needed first to rule out personalization.
+            cached_profile = None
+            fingerprint = None
+            if self.answer_cache is not None:
+                if is_whatsapp and self.user_profile_manager:
+                    cached_profile = await self.user_profile_manager.get_user_profile(user_id)
+                if not self._is_personalized(cached_profile):
+                    fingerprint = await asyncio.to_thread(self.db_manager.catalog_fingerprint)
+                    cached_response = await asyncio.to_thread(self.answer_cache.get, message, fingerprint)
+                    if cached_response is not None:
+                        print("\n=== Answer Cache Hit ===")
+                        await self._finish_turn(user_id, message, cached_response, is_whatsapp)
+                        return cached_response
             
-            # Step 2: Get research results if needed
-            research_results = {}
-            if needs_research and sub_queries:
-                print("\n=== Conducting Research ===")
-                research_results = await self.search_controller.search_research(sub_queries)
+            # Stages run as soon as their inputs are ready:
+            #   profile ──> rag ─────────┐
+            #   decompose ──> research ──┴──> generate
+            graph = StageGraph()
             
-            # Step 3: Get RAG context
-            rag_context = ""
-            if self.rag_handler:
+            async def fetch_profile(_):
+                # User profile for WhatsApp users
+                if cached_profile is not None:
+                    return cached_profile
+                if is_whatsapp and self.user_profile_manager:
+                    return await self.user_profile_manager.get_user_profile(user_id)
+                return None
+            
+            async def decompose(_):
+                # Step 1: Decompose query and check if research needed
+                return await self.query_decomposer.decompose_query(message)
+            
+            async def research(inputs):
+                # Step 2: Get research results if needed
+                decomposition_result = inputs["decompose"]
+                if decomposition_result['needs_research'] and decomposition_result['sub_queries']:
+                    print("\n=== Conducting Research ===")
+                    return await self.search_controller.search_research(decomposition_result['sub_queries'])
+                return {}
+            
+            async def retrieve(inputs):
+                # Step 3: Get RAG context (Chroma work runs in the thread pool)
+                if not self.rag_handler:
+                    return ""
                 print("\n=== Getting RAG Context ===")
-                rag_context = self.rag_handler.get_relevant_context(
+                return await asyncio.to_thread(
+                    self.rag_handler.get_relevant_context,
                     message,
-                    user_profile=user_profile
+                    user_profile=inputs["profile"]
                 )
             
-            # Step 4: Generate comprehensive response
-            print("\n=== Generating Response ===")
-            response = await self.response_generator.generate_response(
-                original_query=message,
-                sub_queries=sub_queries,
-                research_results=research_results,
-                rag_context=rag_context,
-                user_profile=user_profile
-            )
+            async def generate(inputs):
+                # Step 4: Generate comprehensive response
+                print("\n=== Generating Response ===")
+                return await self.response_generator.generate_response(
+                    original_query=message,
+                    sub_queries=inputs["decompose"]['sub_queries'],
+                    research_results=inputs["research"],
+                    rag_context=inputs["rag"],
+                    user_profile=inputs["profile"],
+                    mode=self.config.RESPONSE_MODE_WHATSAPP if is_whatsapp else self.config.RESPONSE_MODE_WEB
+                )
             
-            # Step 5: Update context and user profile
-            self.context_manager.update_context(user_id, message, response)
+            graph.add("profile", fetch_profile)
+            graph.add("decompose", decompose)
+            graph.add("research", research, depends_on=["decompose"])
+            graph.add("rag", retrieve, depends_on=["profile"])
+            graph.add("generate", generate, depends_on=["profile", "decompose", "research", "rag"])
             
-            if is_whatsapp and self.user_profile_manager:
-                context_summary = self.context_manager.get_context_summary(user_id)
-                await self.user_profile_manager.update_profile(
-                    user_id,
-                    message,
-                    response,
-                    context_summary
-                )
+            results = await graph.run()
+            response = results["generate"]
+            print(f"Stage timings: {graph.report()}")
+            
+            # Only share answers built without profile input, and never the error fallback
+            if fingerprint is not None and response != self.response_generator.FALLBACK_RESPONSE:
+                await asyncio.to_thread(self.answer_cache.put, message, response, fingerprint)
+            
+            # Step 5: Update context and user profile
+            await self._finish_turn(user_id, message, response, is_whatsapp)
             
             print("\n=== Response Generation Complete ===")
             return response
@@ -99,10 +187,36 @@ class GeminiHandler:
             print(f"Error in getting response: {str(e)}")
             return self.config.DEFAULT_RESPONSE
 
+    async def _finish_turn(self, user_id: str, message: str, response: str, is_whatsapp: bool):
+        """Update session context and the WhatsApp user profile with a completed turn"""
+        self.context_manager.update_context(user_id, message, response)
+        
+        if is_whatsapp and self.user_profile_manager:
+            context_summary = self.context_manager.get_context_summary(user_id)
+            await self.user_profile_manager.update_profile(
+                user_id,
+                message,
+                response,
+                context_summary
+            )
+
     def clear_context(self, user_id: str):
         """Clear context for a user"""
         self.context_manager.clear_context(user_id)
 
+    def cache_stats(self) -> Dict:
+        """Hit-rate metrics for the LLM-skipping caches and the research classifier"""
+        stats = {}
+        if self.query_decomposer.cache is not None:
+            stats["decomposition"] = self.query_decomposer.cache.stats()
+        if self.answer_cache is not None:
+            stats["answer"] = self.answer_cache.stats()
+        if self.search_controller.cache is not None:
+            stats["research"] = self.search_controller.cache.stats()
+        if self.query_decomposer.classifier is not None:
+            stats["research_classifier"] = self.query_decomposer.classifier.stats()
+        return stats
+
 
 
 """
@@ -115,7 +229,7 @@ AI models and services for comprehensive health-related responses.
 Key Components:
 1. Query Processing:
    - Gemini Flash for query decomposition
-   - Perplexity Sonar for research
+   - Perplexity Sonar for research (persistent research cache)
    - RAG system for local knowledge
    - Context management for conversation history
 
@@ -124,7 +238,7 @@ Key Components:
    - User profile management for WhatsApp
    - Session context management for both platforms
 
-Process Flow:
+Process Flow (stages run concurrently where independent, see StageGraph):
 1. Message Reception:
    - Identifies user and platform
    - Retrieves user profile (WhatsApp)
@@ -149,9 +263,20 @@ Methods:
 1. set_managers(db_manager):
    - Initializes RAG and profile managers
    - Sets up database connections
+   - Attaches the local needs-research classifier and the semantic
+     decomposition cache to the decomposer (metrics via cache_stats())
+   - Creates the semantic answer cache
 
 2. get_response(user_id, message, is_whatsapp):
-   - Main processing pipeline
+   - Answer cache checked first: near-duplicate questions (embedding
+     similarity) under the same catalog_fingerprint() return the stored
+     answer in milliseconds; personalized profiles bypass the cache
+   - Main processing pipeline, run as a dependency graph:
+     profile -> rag and decompose -> research, then generate
+   - Profile fetch, decomposition and RAG retrieval overlap; Gemini calls
+     are native async, blocking Chroma calls run in the thread pool
+   - Logs per-stage timings and the critical path of each request
+   - Response mode chosen per channel (RESPONSE_MODE_WHATSAPP / _WEB)
    - Handles complete conversation flow
    - Returns generated response
 
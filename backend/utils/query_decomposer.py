@@ -1,4 +1,5 @@
 # backend/utils/query_decomposer.py
+import asyncio
 import google.generativeai as genai
 from typing import List, Dict
 import json
@@ -15,9 +16,40 @@ class QueryDecomposer:
                 "max_output_tokens": 1024,
             }
         )
+        self.classifier = None
+        self.cache = None
+
+    def set_classifier(self, classifier):
+        """Attach a ResearchClassifier that can answer needs_research without the LLM"""
+        self.classifier = classifier
+
+    def set_cache(self, cache):
+        """Attach a SemanticCache that reuses decompositions of near-duplicate queries"""
+        self.cache = cache
         
-    def decompose_query(self, query: str) -> Dict[str, List[str]]:
+    async def decompose_query(self, query: str) -> Dict[str, List[str]]:
         """Decompose main query into sub-queries and determine search necessity"""
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get, query)
+            if cached is not None:
+                print(f"\n=== Cached decomposition for: {query} ===")
+                return {
+                    "needs_research": cached["needs_research"],
+                    "sub_queries": list(cached["sub_queries"])
+                }
+
+        if self.classifier is not None:
+            try:
+                # Embedding the query is CPU work; keep it off the event loop
+                if await asyncio.to_thread(self.classifier.confidently_no_research, query):
+                    print(f"\n=== Local triage: no research needed for: {query} ===")
+                    return {
+                        "needs_research": False,
+                        "sub_queries": []
+                    }
+            except Exception as e:
+                print(f"Error in local research triage: {str(e)}")
+
         prompt = f"""Analyze the following health-related query and:
 1. Determine if we need to search for scientific research (yes/no)
 2. Decompose into 3-4 specific sub-queries if research is needed
@@ -40,11 +72,21 @@ If research is not needed, return empty sub_queries list.
 
         try:
             print(f"\n=== Decomposing Query: {query} ===")
-            response = self.model.generate_content(prompt)
+            # Native async call: the event loop keeps serving other requests meanwhile
+            response = await self.model.generate_content_async(prompt)
             
             # Parse JSON response
             result = json.loads(response.text)
             print(f"Needs Research: {result['needs_research']}")
+            if self.classifier is not None:
+                # Only LLM decisions become training data
+                self.classifier.record(query, result['needs_research'])
+            if self.cache is not None:
+                # Near-duplicates reuse these sub-queries, which also keeps research cache keys canonical
+                await asyncio.to_thread(self.cache.put, query, {
+                    "needs_research": result['needs_research'],
+                    "sub_queries": list(result['sub_queries'])
+                })
             if result['needs_research']:
                 print("Sub-queries:", result['sub_queries'])
             
@@ -76,8 +118,20 @@ Key Features:
    - Uses Gemini Flash for fast processing
    - Conservative temperature (0.3) for focused outputs
    - Limited token output for efficiency
+   - Non-blocking generate_content_async call
    - Optimized top_p and top_k for reliable results
 
+3. Local Triage (optional, set_classifier):
+   - A ResearchClassifier answers confident "no research" queries
+     without calling Gemini (greetings, follow-ups, simple questions)
+   - Uncertain queries go to the LLM, whose decision is logged as
+     training data for the classifier
+
+4. Decomposition Cache (optional, set_cache):
+   - A SemanticCache returns the stored result for near-duplicate
+     queries (embedding similarity, TTL, LRU), checked before triage
+   - Only successful LLM decompositions are cached
+
 Output Structure:
 {
     "needs_research": boolean,  # Whether query needs research
@@ -102,7 +156,7 @@ Error Handling:
 
 Usage Example:
 decomposer = QueryDecomposer(api_key)
-result = decomposer.decompose_query("Is ashwagandha safe?")
+result = await decomposer.decompose_query("Is ashwagandha safe?")
 # Returns:
 # {
 #     "needs_research": true,
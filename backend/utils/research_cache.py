@@ -0,0 +1,168 @@
+# backend/utils/research_cache.py
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+class ResearchCache:
+    def __init__(
+        self,
+        path: str,
+        ttl: int = 604800,
+        stale_ttl: int = 2592000,
+        max_entries: int = 20000,
+        namespace: str = ""
+    ):
+        self.path = path
+        # Fresh for ttl seconds, then served stale (and refreshed) for stale_ttl more
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        # Results from another model are not reused
+        self.namespace = namespace
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=10.0)
+        # WAL lets several worker processes read while one writes
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS research ("
+            "key TEXT PRIMARY KEY, query TEXT NOT NULL, content TEXT NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS research_accessed ON research (accessed_at)")
+        self._connection.commit()
+        self._size = self._connection.execute("SELECT COUNT(*) FROM research").fetchone()[0]
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return " ".join(query.lower().split()).rstrip("?!. ")
+
+    def _key(self, query: str) -> str:
+        return f"{self.namespace}|{self.normalize(query)}"
+
+    def get(self, query: str) -> Optional[Tuple[str, bool]]:
+        """(content, is_fresh) for a cached sub-query, or None if missing or past the stale window"""
+        key = self._key(query)
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._connection.execute(
+                    "SELECT content, created_at FROM research WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                content, created_at = row
+                age = now - created_at
+                if age >= self.ttl + self.stale_ttl:
+                    self._connection.execute("DELETE FROM research WHERE key = ?", (key,))
+                    self._connection.commit()
+                    self._size -= 1
+                    self.misses += 1
+                    return None
+                self._connection.execute("UPDATE research SET accessed_at = ? WHERE key = ?", (now, key))
+                self._connection.commit()
+                if age < self.ttl:
+                    self.hits += 1
+                    return content, True
+                self.stale_hits += 1
+                return content, False
+        except sqlite3.Error as e:
+            print(f"Error reading research cache: {str(e)}")
+            return None
+
+    def put(self, query: str, content: str):
+        key = self._key(query)
+        now = time.time()
+        try:
+            with self._lock:
+                exists = self._connection.execute("SELECT 1 FROM research WHERE key = ?", (key,)).fetchone()
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO research (key, query, content, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, query, content, now, now)
+                )
+                if not exists:
+                    self._size += 1
+                if self._size > self.max_entries:
+                    self._evict()
+                self._connection.commit()
+        except sqlite3.Error as e:
+            print(f"Error writing research cache: {str(e)}")
+
+    def _evict(self):
+        """Drop least recently used entries down to 90% of max_entries (caller holds the lock)"""
+        target = int(self.max_entries * 0.9)
+        # Other processes share the file, so recount before trimming
+        self._size = self._connection.execute("SELECT COUNT(*) FROM research").fetchone()[0]
+        excess = self._size - target
+        if excess <= 0:
+            return
+        self._connection.execute(
+            "DELETE FROM research WHERE key IN (SELECT key FROM research ORDER BY accessed_at LIMIT ?)",
+            (excess,)
+        )
+        self._size -= excess
+        self.evictions += excess
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "entries": self._size,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions
+            }
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+
+"""
+ResearchCache: Persistent TTL Cache for Sonar Research Results
+
+The same sub-queries ("What are the potential risks and side effects of
+melatonin?") recur constantly, and each one is a slow, paid Sonar call.
+This class stores research results in SQLite keyed by normalized
+sub-query, so they survive restarts and are shared by worker processes.
+
+Key Features:
+1. Freshness:
+   - Fresh for ttl seconds: served directly
+   - Then stale for stale_ttl seconds: served immediately while the caller
+     refreshes it in the background (stale-while-revalidate)
+   - Older entries are treated as misses and deleted
+
+2. Keys:
+   - Lowercased, whitespace-collapsed, trailing punctuation stripped
+   - Prefixed with a namespace (the Sonar model), so a model change does
+     not reuse old answers
+
+3. Bounds:
+   - accessed_at updated on every hit
+   - Past max_entries, least recently used rows are trimmed to 90%
+
+4. Storage:
+   - Single table, WAL journal, safe across threads and processes
+   - Errors are logged and treated as misses
+
+Usage Example:
+cache = ResearchCache("data/research_cache.sqlite3", ttl=604800, stale_ttl=2592000)
+entry = cache.get("What are the risks of melatonin?")
+if entry is None:
+    cache.put("What are the risks of melatonin?", content)
+"""
@@ -0,0 +1,251 @@
+# backend/utils/research_classifier.py
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class ResearchClassifier:
+    MODEL_VERSION = 1
+
+    def __init__(
+        self,
+        embedding_function,
+        model_path: Optional[str] = None,
+        log_path: Optional[str] = None,
+        threshold: float = 0.85,
+        min_examples: int = 200
+    ):
+        self.embedding_function = embedding_function
+        self.model_path = model_path
+        self.log_path = log_path
+        # Only answers at least this confident skip the LLM
+        self.threshold = threshold
+        self.min_examples = min_examples
+        self._weights: Optional[np.ndarray] = None
+        self._bias = 0.0
+        self.metrics: Dict = {}
+        self._log_lock = threading.Lock()
+        self.skipped = 0
+        self.deferred = 0
+
+        if model_path:
+            self.load()
+
+    @property
+    def is_trained(self) -> bool:
+        return self._weights is not None
+
+    def record(self, query: str, needs_research: bool):
+        """Append an LLM decomposer decision to the training log"""
+        if not self.log_path:
+            return
+        try:
+            line = json.dumps({"query": query, "needs_research": bool(needs_research), "ts": time.time()})
+            with self._log_lock:
+                with open(self.log_path, 'a', encoding='utf-8') as file:
+                    file.write(line + "\n")
+        except Exception as e:
+            print(f"Error logging decomposer decision: {str(e)}")
+
+    def _read_log(self) -> Tuple[List[str], np.ndarray]:
+        # Latest decision per (normalized) query wins
+        labels: Dict[str, Tuple[str, bool]] = {}
+        with open(self.log_path, 'r', encoding='utf-8') as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                labels[" ".join(entry["query"].lower().split())] = (entry["query"], bool(entry["needs_research"]))
+        queries = [query for query, _ in labels.values()]
+        return queries, np.array([label for _, label in labels.values()], dtype=np.float32)
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self.embedding_function(texts), dtype=np.float32)
+
+    @staticmethod
+    def _fit(features: np.ndarray, labels: np.ndarray, iterations: int = 500, learning_rate: float = 0.5, l2: float = 1e-3):
+        """Class-balanced L2-regularized logistic regression by batch gradient descent"""
+        positives = max(labels.sum(), 1.0)
+        negatives = max(len(labels) - labels.sum(), 1.0)
+        sample_weights = np.where(labels == 1, len(labels) / (2 * positives), len(labels) / (2 * negatives))
+        weights = np.zeros(features.shape[1], dtype=np.float64)
+        bias = 0.0
+        for _ in range(iterations):
+            probabilities = 1.0 / (1.0 + np.exp(-(features @ weights + bias)))
+            error = (probabilities - labels) * sample_weights / len(labels)
+            weights -= learning_rate * (features.T @ error + l2 * weights)
+            bias -= learning_rate * float(error.sum())
+        return weights.astype(np.float32), bias
+
+    def _probabilities(self, features: np.ndarray, weights: np.ndarray, bias: float) -> np.ndarray:
+        return 1.0 / (1.0 + np.exp(-(features @ weights + bias)))
+
+    def _evaluate(self, probabilities: np.ndarray, labels: np.ndarray) -> Dict:
+        skip = probabilities <= 1.0 - self.threshold
+        return {
+            "accuracy": float(((probabilities >= 0.5) == (labels == 1)).mean()) if len(labels) else 0.0,
+            # Share of messages that would skip the LLM, and how often that skip is right
+            "skip_rate": float(skip.mean()) if len(labels) else 0.0,
+            "skip_precision": float((labels[skip] == 0).mean()) if skip.any() else 0.0
+        }
+
+    def train(self, holdout: float = 0.2, seed: int = 0) -> Optional[Dict]:
+        """Fit on the decision log, report held-out metrics, then refit on everything and save"""
+        if not self.log_path or not os.path.exists(self.log_path):
+            return None
+        try:
+            queries, labels = self._read_log()
+            if len(queries) < self.min_examples:
+                print(f"Not training research classifier: {len(queries)} examples < {self.min_examples}")
+                return None
+
+            features = self._embed(queries)
+            order = np.random.default_rng(seed).permutation(len(queries))
+            split = int(len(order) * (1.0 - holdout))
+            train, test = order[:split], order[split:]
+
+            weights, bias = self._fit(features[train], labels[train])
+            metrics = self._evaluate(self._probabilities(features[test], weights, bias), labels[test])
+            metrics.update({"examples": len(queries), "held_out": len(test), "trained_at": time.time()})
+
+            self._weights, self._bias = self._fit(features, labels)
+            self.metrics = metrics
+            self.save()
+            print(
+                f"Trained research classifier on {len(queries)} examples: accuracy {metrics['accuracy']:.3f}, "
+                f"skip rate {metrics['skip_rate']:.3f}, skip precision {metrics['skip_precision']:.3f}"
+            )
+            return metrics
+
+        except Exception as e:
+            print(f"Error training research classifier: {str(e)}")
+            return None
+
+    def predict(self, query: str) -> Optional[float]:
+        """Probability that the query needs research, or None when untrained"""
+        if self._weights is None:
+            return None
+        features = self._embed([query])
+        return float(self._probabilities(features, self._weights, self._bias)[0])
+
+    def confidently_no_research(self, query: str) -> bool:
+        """True when the LLM call can be skipped; anything uncertain is left to the LLM"""
+        probability = self.predict(query)
+        if probability is not None and probability <= 1.0 - self.threshold:
+            self.skipped += 1
+            return True
+        self.deferred += 1
+        return False
+
+    def save(self) -> bool:
+        if not self.model_path or self._weights is None:
+            return False
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.model_path)), exist_ok=True)
+            tmp_path = f"{self.model_path}.tmp"
+            with open(tmp_path, 'wb') as file:
+                np.savez(
+                    file,
+                    version=self.MODEL_VERSION,
+                    weights=self._weights,
+                    bias=np.float32(self._bias),
+                    metrics=np.array(json.dumps(self.metrics))
+                )
+            os.replace(tmp_path, self.model_path)
+            return True
+        except Exception as e:
+            print(f"Error saving research classifier: {str(e)}")
+            return False
+
+    def load(self) -> bool:
+        if not self.model_path or not os.path.exists(self.model_path):
+            return False
+        try:
+            with np.load(self.model_path, allow_pickle=False) as data:
+                if int(data["version"]) != self.MODEL_VERSION:
+                    print(f"Ignoring research classifier with version {int(data['version'])}")
+                    return False
+                self._weights = data["weights"].astype(np.float32)
+                self._bias = float(data["bias"])
+                self.metrics = json.loads(str(data["metrics"]))
+            return True
+        except Exception as e:
+            print(f"Error loading research classifier: {str(e)}")
+            return False
+
+    def stats(self) -> Dict:
+        total = self.skipped + self.deferred
+        return {
+            "trained": self.is_trained,
+            "skipped": self.skipped,
+            "deferred": self.deferred,
+            "skip_rate": self.skipped / total if total else 0.0,
+            "holdout": self.metrics
+        }
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from chromadb.utils import embedding_functions
+    from config import Config
+
+    parser = argparse.ArgumentParser(description="Train the needs-research classifier from logged decomposer decisions")
+    parser.add_argument('--log', default=Config.RESEARCH_LOG_PATH)
+    parser.add_argument('--model', default=Config.RESEARCH_CLASSIFIER_PATH)
+    parser.add_argument('--min-examples', type=int, default=Config.RESEARCH_CLASSIFIER_MIN_EXAMPLES)
+    parser.add_argument('--threshold', type=float, default=Config.RESEARCH_CLASSIFIER_THRESHOLD)
+    args = parser.parse_args()
+
+    classifier = ResearchClassifier(
+        embedding_functions.DefaultEmbeddingFunction(),
+        model_path=args.model,
+        log_path=args.log,
+        threshold=args.threshold,
+        min_examples=args.min_examples
+    )
+    print(classifier.train())
+
+
+
+"""
+ResearchClassifier: Local Needs-Research Triage for QueryDecomposer
+
+Every message used to pay for a Gemini Flash round-trip just to learn
+needs_research, and most traffic (greetings, follow-ups, simple lifestyle
+questions) does not need research. This class predicts needs_research
+locally from the query embedding and lets QueryDecomposer skip the LLM
+when it is confident the answer is "no".
+
+Key Features:
+1. Training Data:
+   - QueryDecomposer logs every LLM decision (query, needs_research) to NDJSON
+   - Latest decision per normalized query is used
+   - Predictions are never logged, so the model does not train on itself
+
+2. Model:
+   - Logistic regression over the shared (cached) sentence embeddings
+   - Class-balanced, L2-regularized, batch gradient descent in NumPy
+   - Held-out accuracy, skip rate and skip precision reported before the
+     final refit on all examples; saved as a small .npz file
+
+3. Decision:
+   - P(needs_research) <= 1 - threshold: skip the LLM, no research
+   - Anything else (including confident "yes", which still needs
+     sub-queries) goes to the LLM
+   - Untrained classifier defers everything
+
+Training:
+python research_classifier.py [--log data/decomposer_log.ndjson] [--model data/research_classifier.npz]
+
+Usage Example:
+classifier = ResearchClassifier(db_manager.embedding_function, model_path, log_path)
+if classifier.confidently_no_research("hi there"):
+    ...
+"""
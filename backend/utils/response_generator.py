@@ -1,9 +1,16 @@
 # backend/utils/response_generator.py
 import google.generativeai as genai
+import json
+import time
 from typing import Dict, List, Optional
 
 class ResponseGenerator:
-    def __init__(self, api_key: str):
+    FALLBACK_RESPONSE = """I apologize, but I'm having trouble generating a response right now. 
+For your safety and best advice, please consider consulting with a healthcare professional."""
+    # two_pass: reasoning call, then an answer call; single_pass: one structured call
+    MODES = ("two_pass", "single_pass")
+
+    def __init__(self, api_key: str, mode: str = "two_pass"):
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel(
             model_name="gemini-1.5-pro",
@@ -14,6 +21,14 @@ class ResponseGenerator:
                 "max_output_tokens": 8192,
             }
         )
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown response mode: {mode}")
+        self.mode = mode
+        # mode -> responses, Gemini requests, prompt/output tokens and seconds, for benchmarking
+        self.usage: Dict[str, Dict[str, float]] = {
+            name: {"responses": 0, "requests": 0, "prompt_tokens": 0, "output_tokens": 0, "seconds": 0.0}
+            for name in self.MODES
+        }
     
     async def generate_response(
         self, 
@@ -21,35 +36,64 @@ class ResponseGenerator:
         sub_queries: List[str], 
         research_results: Dict[str, str],
         rag_context: Optional[str] = None,
-        user_profile: Optional[Dict] = None
+        user_profile: Optional[Dict] = None,
+        mode: Optional[str] = None
     ) -> str:
-        """Generate natural, contextual response using Chain of Thought"""
+        """Generate natural, contextual response using Chain of Thought (mode defaults to the generator's)"""
         try:
             print("\n=== Generating Response ===")
+            mode = mode or self.mode
+            if mode not in self.MODES:
+                raise ValueError(f"Unknown response mode: {mode}")
             
-            # Prepare context information
-            context_parts = []
-            
-            # Add RAG context if available
-            if rag_context:
-                context_parts.append(f"Local Knowledge:\n{rag_context}")
-            
-            # Add user profile context if available
-            if user_profile and user_profile.get('summary'):
-                context_parts.append(f"User Context:\n{user_profile['summary']}")
+            context = self._build_context(research_results, rag_context, user_profile)
             
-            # Add research findings
-            if research_results:
-                research_summary = "\n".join([
-                    f"Research on {query}:\n{results}"
-                    for query, results in research_results.items()
-                ])
-                context_parts.append(f"Research Findings:\n{research_summary}")
+            started = time.perf_counter()
+            if mode == "single_pass":
+                text, responses = await self._single_pass(original_query, context)
+            else:
+                text, responses = await self._two_pass(original_query, context)
+            self._record_usage(mode, responses, time.perf_counter() - started)
+            print("Response generated successfully")
             
-            # Combine all context
-            context = "\n\n".join(context_parts)
+            return text
             
-            prompt = f"""As a health advisor, use Chain of Thought reasoning to provide a helpful response.
+        except Exception as e:
+            print(f"Error generating response: {str(e)}")
+            return self.FALLBACK_RESPONSE
+
+    def _build_context(
+        self,
+        research_results: Dict[str, str],
+        rag_context: Optional[str] = None,
+        user_profile: Optional[Dict] = None
+    ) -> str:
+        """Combine local knowledge, profile summary and research findings into one context block"""
+        # Prepare context information
+        context_parts = []
+        
+        # Add RAG context if available
+        if rag_context:
+            context_parts.append(f"Local Knowledge:\n{rag_context}")
+        
+        # Add user profile context if available
+        if user_profile and user_profile.get('summary'):
+            context_parts.append(f"User Context:\n{user_profile['summary']}")
+        
+        # Add research findings
+        if research_results:
+            research_summary = "\n".join([
+                f"Research on {query}:\n{results}"
+                for query, results in research_results.items()
+            ])
+            context_parts.append(f"Research Findings:\n{research_summary}")
+        
+        # Combine all context
+        return "\n\n".join(context_parts)
+
+    async def _two_pass(self, original_query: str, context: str):
+        """Chain-of-thought call, then a second call that turns the reasoning into the answer"""
+        prompt = f"""As a health advisor, use Chain of Thought reasoning to provide a helpful response.
 
 User Query: {original_query}
 
@@ -90,11 +134,12 @@ Now, think through your response step by step, then provide a natural, focused a
 
 Reasoning:"""
 
-            print("Getting CoT response from Gemini...")
-            cot_response = self.model.generate_content(prompt)
-            
-            # Generate final response without the reasoning
-            final_prompt = f"""Based on this reasoning:
+        print("Getting CoT response from Gemini...")
+        # Native async calls so a slow generation never blocks other in-flight requests
+        cot_response = await self.model.generate_content_async(prompt)
+        
+        # Generate final response without the reasoning
+        final_prompt = f"""Based on this reasoning:
 
 {cot_response.text}
 
@@ -109,15 +154,59 @@ Remember:
 
 Final Response:"""
 
-            final_response = self.model.generate_content(final_prompt)
-            print("Response generated successfully")
-            
-            return final_response.text
-            
-        except Exception as e:
-            print(f"Error generating response: {str(e)}")
-            return """I apologize, but I'm having trouble generating a response right now. 
-For your safety and best advice, please consider consulting with a healthcare professional."""
+        final_response = await self.model.generate_content_async(final_prompt)
+        return final_response.text, [cot_response, final_response]
+
+    async def _single_pass(self, original_query: str, context: str):
+        """One call whose JSON output keeps brief private reasoning apart from the user-facing answer"""
+        prompt = f"""As a health advisor, answer the user's question using the context below.
+
+User Query: {original_query}
+
+Context Information:
+{context}
+
+Before answering, briefly consider: the main health topic and level of detail needed, which
+context and research findings are relevant, any safety concerns or warnings, and whether
+professional consultation should be recommended.
+
+Important Guidelines:
+- Only mention general health tips (water, sleep, vitamins) if directly relevant
+- Include product recommendations only if specifically relevant
+- Keep the response focused on the user's question
+- Be clear about limitations and uncertainties
+- Maintain a conversational but professional tone
+- Be direct, concise and natural
+
+Respond with a JSON object with exactly these keys:
+{{
+    "reasoning": "at most five short notes on the points above (never shown to the user)",
+    "answer": "the natural, conversational response to the user's question"
+}}"""
+
+        print("Getting single-pass response from Gemini...")
+        response = await self.model.generate_content_async(
+            prompt,
+            generation_config={"response_mime_type": "application/json"}
+        )
+        try:
+            answer = json.loads(response.text)["answer"].strip()
+        except (ValueError, KeyError, TypeError, AttributeError):
+            # Malformed JSON: better to show the raw text than to fail the request
+            print("Single-pass response was not valid JSON, using raw text")
+            answer = response.text.strip()
+        return answer or self.FALLBACK_RESPONSE, [response]
+
+    def _record_usage(self, mode: str, responses: List, seconds: float):
+        usage = self.usage[mode]
+        usage["responses"] += 1
+        usage["requests"] += len(responses)
+        usage["seconds"] += seconds
+        for response in responses:
+            metadata = getattr(response, "usage_metadata", None)
+            if metadata is not None:
+                usage["prompt_tokens"] += getattr(metadata, "prompt_token_count", 0) or 0
+                usage["output_tokens"] += getattr(metadata, "candidates_token_count", 0) or 0
 
 
 
@@ -135,9 +224,14 @@ Gemini Pro model. It implements Chain of Thought (CoT) reasoning for more accura
 and relevant responses to health-related queries.
 
 Key Features:
-1. Two-Stage Generation:
-   - Chain of Thought reasoning stage
-   - Natural response formulation stage
+1. Generation Modes (per generator, overridable per call):
+   - two_pass: Chain of Thought reasoning stage, then a natural response
+     formulation stage that re-sends the reasoning
+   - single_pass: one call returning JSON {"reasoning", "answer"}; the
+     brief reasoning is dropped and only the answer is returned (about
+     half the latency, no re-sent reasoning tokens)
+   - usage: per-mode responses, requests, prompt/output tokens, seconds
+   - benchmark_response.py compares both modes on real queries
    
 2. Context Integration:
    - Local knowledge (RAG)
@@ -156,6 +250,7 @@ Model Configuration:
 - Balanced temperature (0.7) for creativity
 - High top_p (0.95) for natural variation
 - Large output capacity (8192 tokens)
+- Non-blocking generate_content_async calls
 
 Process Flow:
 1. Context Preparation:
@@ -186,7 +281,8 @@ response = await generator.generate_response(
     query="Is melatonin safe?",
     sub_queries=["safety", "dosage"],
     research_results={"safety": "Studies show..."},
-    rag_context="Local data about melatonin..."
+    rag_context="Local data about melatonin...",
+    mode="single_pass"
 )
 
 Note: This component ensures responses are:
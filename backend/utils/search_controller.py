@@ -1,28 +1,13 @@
 # backend/utils/search_controller.py
 from openai import AsyncOpenAI
-from typing import List, Dict
+from typing import List, Dict, Optional
 import json
 import asyncio
+import threading
+from utils.research_cache import ResearchCache
 
 class SearchController:
-    def __init__(self, api_key: str):
-        self.client = AsyncOpenAI(api_key=api_key)
-        self.model = "llama-3.1-sonar-small-128k-online"
-    
-    async def search_research(self, queries: List[str]) -> Dict[str, str]:
-        """Search for research papers and medical data"""
-        results = {}
-        
-        # Process queries concurrently
-        async def process_query(query: str) -> tuple:
-            try:
-                print(f"\n=== Searching for: {query} ===")
-                response = await self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": """You are a medical research assistant. Search and summarize recent, reliable research papers and medical data.
+    SYSTEM_PROMPT = """You are a medical research assistant. Search and summarize recent, reliable research papers and medical data.
 Focus on:
 1. Scientific evidence and clinical studies
 2. Potential health risks and safety concerns
@@ -34,18 +19,85 @@ Format your response to include:
 - Safety warnings
 - Scientific consensus
 - References to studies (if available)"""
-                        },
-                        {
-                            "role": "user",
-                            "content": f"Search for recent scientific research about: {query}"
-                        }
-                    ],
-                    temperature=0.3,
-                    max_tokens=1024
-                )
+
+    def __init__(self, api_key: str, cache: Optional[ResearchCache] = None):
+        self.api_key = api_key
+        self.client = AsyncOpenAI(api_key=api_key)
+        self.model = "llama-3.1-sonar-small-128k-online"
+        self.cache = cache
+        # Stale entries are refreshed on a dedicated loop that outlives the request's loop
+        self._refresh_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._refresh_client = None
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+    
+    async def _fetch(self, client, query: str) -> str:
+        """One Sonar research call"""
+        response = await client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": self.SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": f"Search for recent scientific research about: {query}"
+                }
+            ],
+            temperature=0.3,
+            max_tokens=1024
+        )
+        return response.choices[0].message.content
+
+    def _schedule_refresh(self, query: str):
+        """Re-fetch a stale entry in the background, at most once at a time per sub-query"""
+        key = self.cache.normalize(query)
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            if self._refresh_loop is None:
+                self._refresh_loop = asyncio.new_event_loop()
+                # The client's connection pool belongs to the loop it is used on
+                self._refresh_client = AsyncOpenAI(api_key=self.api_key)
+                threading.Thread(target=self._refresh_loop.run_forever, name="research-refresh", daemon=True).start()
+
+        async def refresh():
+            try:
+                content = await self._fetch(self._refresh_client, query)
+                await asyncio.to_thread(self.cache.put, query, content)
+                print(f"Refreshed cached research for: {query}")
+            except Exception as e:
+                print(f"Error refreshing research for {query}: {str(e)}")
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
+
+        asyncio.run_coroutine_threadsafe(refresh(), self._refresh_loop)
+    
+    async def search_research(self, queries: List[str]) -> Dict[str, str]:
+        """Search for research papers and medical data"""
+        results = {}
+        
+        # Process queries concurrently
+        async def process_query(query: str) -> tuple:
+            try:
+                if self.cache is not None:
+                    cached = await asyncio.to_thread(self.cache.get, query)
+                    if cached is not None:
+                        content, fresh = cached
+                        if not fresh:
+                            # Serve the stale result now, refresh it for the next caller
+                            self._schedule_refresh(query)
+                        print(f"\n=== Cached research ({'fresh' if fresh else 'stale'}) for: {query} ===")
+                        return query, content
                 
-                content = response.choices[0].message.content
+                print(f"\n=== Searching for: {query} ===")
+                content = await self._fetch(self.client, query)
                 print(f"Found research for: {query}")
+                if self.cache is not None:
+                    await asyncio.to_thread(self.cache.put, query, content)
                 return query, content
                 
             except Exception as e:
@@ -60,7 +112,6 @@ Format your response to include:
         results = dict(query_results)
         
         return results
-    
 
 
 """
@@ -82,7 +133,13 @@ Key Features:
    - Safety concerns
    - Expert opinions
 
-3. Response Formatting:
+3. Research Cache (optional ResearchCache):
+   - Fresh cached results returned without calling Sonar
+   - Stale results returned immediately and refreshed on a background
+     event loop thread (one refresh per sub-query at a time)
+   - Misses fetched and stored; errors are never cached
+
+4. Response Formatting:
    - Key findings
    - Safety warnings
    - Scientific consensus
@@ -115,7 +172,7 @@ Error Handling:
 - Detailed error reporting
 
 Usage Example:
-controller = SearchController(api_key)
+controller = SearchController(api_key, cache=ResearchCache("data/research_cache.sqlite3"))
 results = await controller.search_research([
     "melatonin safety studies",
     "melatonin dosage research"
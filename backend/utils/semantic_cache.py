@@ -0,0 +1,202 @@
+# backend/utils/semantic_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class SemanticCache:
+    def __init__(
+        self,
+        embedding_function,
+        threshold: float = 0.9,
+        ttl: int = 86400,
+        max_entries: int = 5000,
+        name: str = "semantic"
+    ):
+        self.embedding_function = embedding_function
+        # Minimum cosine similarity for a near-duplicate hit
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.name = name
+        self._lock = threading.Lock()
+
+        # Fixed slots: row i of _vectors belongs to _entries[i]; allocated on first put
+        self._vectors: Optional[np.ndarray] = None
+        self._valid = np.zeros(max_entries, dtype=bool)
+        self._expires = np.zeros(max_entries, dtype=np.float64)
+        self._entries: List[Optional[Tuple[str, Optional[str], object]]] = [None] * max_entries
+        self._free = list(range(max_entries - 1, -1, -1))
+        # slot -> None, least recently used first
+        self._lru: "OrderedDict[int, None]" = OrderedDict()
+        # (normalized text, fingerprint) -> slot, so exact repeats skip the similarity scan
+        self._exact: Dict[Tuple[str, Optional[str]], int] = {}
+
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.lower().split()).rstrip("?!. ")
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(self.embedding_function([text])[0], dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _release(self, slot: int):
+        text, fingerprint, _ = self._entries[slot]
+        self._exact.pop((text, fingerprint), None)
+        self._entries[slot] = None
+        self._valid[slot] = False
+        self._lru.pop(slot, None)
+        self._free.append(slot)
+
+    def _expire(self, slot: int) -> bool:
+        if self._expires[slot] > time.time():
+            return False
+        self._release(slot)
+        self.expirations += 1
+        return True
+
+    def _hit(self, slot: int):
+        self._lru.move_to_end(slot)
+        return self._entries[slot][2]
+
+    def get(self, text: str, fingerprint: Optional[str] = None):
+        """Cached value for text or a near-duplicate stored under the same fingerprint, else None"""
+        key = (self.normalize(text), fingerprint)
+        with self._lock:
+            slot = self._exact.get(key)
+            if slot is not None and not self._expire(slot):
+                self.exact_hits += 1
+                return self._hit(slot)
+            if not self._lru:
+                self.misses += 1
+                return None
+
+        try:
+            vector = self._embed(key[0])
+        except Exception as e:
+            print(f"Error embedding {self.name} cache key: {str(e)}")
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != len(vector):
+                self.misses += 1
+                return None
+            candidates = np.flatnonzero(self._valid)
+            if len(candidates):
+                similarities = self._vectors[candidates] @ vector
+                # Best first, skipping expired entries and other fingerprints
+                for index in np.argsort(-similarities):
+                    if similarities[index] < self.threshold:
+                        break
+                    slot = int(candidates[index])
+                    if self._entries[slot][1] != fingerprint or self._expire(slot):
+                        continue
+                    self.semantic_hits += 1
+                    return self._hit(slot)
+            self.misses += 1
+            return None
+
+    def put(self, text: str, value, fingerprint: Optional[str] = None, ttl: Optional[int] = None):
+        normalized = self.normalize(text)
+        try:
+            vector = self._embed(normalized)
+        except Exception as e:
+            print(f"Error embedding {self.name} cache key: {str(e)}")
+            return
+
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+            elif self._vectors.shape[1] != len(vector):
+                return
+
+            slot = self._exact.get((normalized, fingerprint))
+            if slot is None:
+                if not self._free:
+                    self._release(next(iter(self._lru)))
+                    self.evictions += 1
+                slot = self._free.pop()
+                self._exact[(normalized, fingerprint)] = slot
+            self._vectors[slot] = vector
+            self._valid[slot] = True
+            self._expires[slot] = time.time() + (self.ttl if ttl is None else ttl)
+            self._entries[slot] = (normalized, fingerprint, value)
+            self._lru[slot] = None
+            self._lru.move_to_end(slot)
+
+    def invalidate(self, fingerprint: Optional[str] = None):
+        """Drop every entry, or only those stored under fingerprint"""
+        with self._lock:
+            for slot in list(self._lru):
+                if fingerprint is None or self._entries[slot][1] == fingerprint:
+                    self._release(slot)
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits = self.exact_hits + self.semantic_hits
+            lookups = hits + self.misses
+            return {
+                "name": self.name,
+                "entries": len(self._lru),
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions
+            }
+
+
+
+"""
+SemanticCache: Embedding-Similarity Cache for LLM Pipeline Results
+
+Users phrase the same question many ways ("is ashwagandha safe",
+"ashwagandha side effects?"). This class caches a value per query and
+serves it for any later query whose embedding is close enough, so
+repeat topics skip the LLM call that produced it.
+
+Key Features:
+1. Lookup:
+   - Exact normalized-text match first (no embedding needed)
+   - Otherwise cosine similarity against every live entry in one
+     matrix-vector product; best match >= threshold wins
+   - Optional fingerprint: only entries stored under the same
+     fingerprint match (e.g. a retrieval-context version)
+
+2. Bounds:
+   - Per-entry TTL (default from the constructor, overridable per put)
+   - Fixed number of slots with LRU eviction
+   - Vectors kept in a preallocated float32 matrix
+
+3. Metrics (stats()):
+   - exact_hits, semantic_hits, misses, hit_rate
+   - expirations, evictions, entries
+
+Embeddings come from the shared CachedEmbeddingFunction, so putting a
+value right after a missed get reuses the query's cached embedding.
+Thread-safe; embedding runs outside the lock.
+
+Usage Example:
+cache = SemanticCache(db_manager.embedding_function, threshold=0.9, ttl=604800)
+result = cache.get("ashwagandha side effects?")
+if result is None:
+    result = await decomposer_llm(query)
+    cache.put(query, result)
+print(cache.stats())
+"""
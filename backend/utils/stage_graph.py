@@ -0,0 +1,102 @@
+# backend/utils/stage_graph.py
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+
+class StageGraph:
+    def __init__(self):
+        # name -> (stage function, dependency names), in insertion order
+        self._stages: Dict[str, tuple] = {}
+        self.results: Dict[str, object] = {}
+        # name -> (start, end) in ms since run() started
+        self.timings: Dict[str, tuple] = {}
+
+    def add(self, name: str, stage: Callable[[Dict], Awaitable], depends_on: Optional[List[str]] = None):
+        """Register a stage; it is called with the results of its dependencies once they finish"""
+        for dependency in depends_on or []:
+            if dependency not in self._stages:
+                raise ValueError(f"Stage {name} depends on unknown stage {dependency}")
+        self._stages[name] = (stage, list(depends_on or []))
+
+    async def run(self) -> Dict[str, object]:
+        """Run every stage as soon as its dependencies are done; the first failure cancels the rest"""
+        started = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(name: str):
+            stage, dependencies = self._stages[name]
+            if dependencies:
+                await asyncio.gather(*(tasks[dependency] for dependency in dependencies))
+            begin = (time.perf_counter() - started) * 1000
+            result = await stage({dependency: self.results[dependency] for dependency in dependencies})
+            self.results[name] = result
+            self.timings[name] = (begin, (time.perf_counter() - started) * 1000)
+            return result
+
+        # Dependencies are registered first, so their tasks exist before dependents await them
+        for name in self._stages:
+            tasks[name] = asyncio.create_task(run_stage(name))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        return self.results
+
+    def critical_path(self) -> List[str]:
+        """Chain of stages that determined the total latency, first to last"""
+        if not self.timings:
+            return []
+        name = max(self.timings, key=lambda stage: self.timings[stage][1])
+        path = [name]
+        while True:
+            dependencies = [dependency for dependency in self._stages[name][1] if dependency in self.timings]
+            if not dependencies:
+                break
+            name = max(dependencies, key=lambda stage: self.timings[stage][1])
+            path.append(name)
+        return list(reversed(path))
+
+    def report(self) -> str:
+        stages = ", ".join(
+            f"{name}={end - start:.0f}ms"
+            for name, (start, end) in sorted(self.timings.items(), key=lambda item: item[1][0])
+        )
+        total = max((end for _, end in self.timings.values()), default=0.0)
+        return f"{total:.0f}ms total ({stages}); critical path: {' -> '.join(self.critical_path())}"
+
+
+
+"""
+StageGraph: Dependency-Ordered Concurrent Execution of Pipeline Stages
+
+This class runs the stages of a request pipeline as asyncio tasks, each
+starting as soon as the stages it depends on have finished, so the
+end-to-end latency is the critical path instead of the sum of all stages.
+
+Key Features:
+1. Stages:
+   - Async callables taking {dependency name: result}
+   - Registered with add(name, stage, depends_on=[...])
+   - Blocking work should be wrapped with asyncio.to_thread inside the stage
+
+2. Execution:
+   - One task per stage; independent stages overlap
+   - The first failing stage cancels the rest and re-raises
+
+3. Timings:
+   - timings: name -> (start, end) in ms from the start of run()
+   - critical_path(): chain of stages that determined total latency
+   - report(): one-line summary for logging
+
+Usage Example:
+graph = StageGraph()
+graph.add("profile", fetch_profile)
+graph.add("decompose", decompose)
+graph.add("rag", retrieve, depends_on=["profile"])
+graph.add("generate", generate, depends_on=["decompose", "rag"])
+results = await graph.run()
+print(graph.report())
+"""
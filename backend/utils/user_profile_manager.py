@@ -1,29 +1,43 @@
 from typing import Dict, List, Optional
+from collections import OrderedDict
 from datetime import datetime
+from database.profile_codec import HEALTH_TOPICS, encode_topics
 import json
+import threading
 
 class UserProfileManager:
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, cache_size: int = 10000, touch_interval: int = 300, async_db_manager=None):
         self.db_manager = db_manager
+        # Optional AsyncChromaDBManager; profile reads/writes then run off the event loop
+        self.async_db_manager = async_db_manager
         self.collection_name = "user_profiles"
+        
+        # Bounded write-through cache: user_id -> profile
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict]" = OrderedDict()
+        # user_id -> (serialized copy of what is stored, when it was stored) for dirty-tracking
+        self._stored_snapshots: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        # Persist a bare last_interaction bump at most this often (seconds)
+        self.touch_interval = touch_interval
     
     async def get_user_profile(self, user_id: str) -> Dict:
-        """Get user profile from database"""
+        """Get user profile from cache, falling back to the database"""
         try:
-            profile = self.db_manager.get_user_profile(user_id)
+            with self._lock:
+                profile = self._cache.get(user_id)
+                if profile is not None:
+                    self._cache.move_to_end(user_id)
+                    return profile
+            
+            stored = True
+            profile = await self._get_stored_profile(user_id)
             if not profile:
                 # Create default profile
-                profile = {
-                    "user_id": user_id,
-                    "summary": "",
-                    "key_topics": [],
-                    "health_concerns": [],
-                    "preferences": {"language": "en"},
-                    "created_at": datetime.now().isoformat(),
-                    "last_interaction": datetime.now().isoformat()
-                }
-                self.db_manager.store_user_profile(user_id, profile)
+                profile = self._create_default_profile(user_id)
+                stored = await self._store_profile(user_id, profile)
             
+            self._remember(user_id, profile, stored=stored)
             return profile
             
         except Exception as e:
@@ -51,10 +65,18 @@ class UserProfileManager:
             # Extract and update key topics
             topics = self._extract_topics(message, response)
             if topics:
-                profile["key_topics"] = list(set(profile["key_topics"] + topics))
+                # Vocabulary order so an unchanged topic set serializes identically
+                merged = set(profile["key_topics"] + topics)
+                profile["key_topics"] = [topic for topic in HEALTH_TOPICS if topic in merged] + \
+                    sorted(merged - set(HEALTH_TOPICS))
+                profile["topic_bits"] = encode_topics(profile["key_topics"])
             
-            # Store updated profile
-            self.db_manager.store_user_profile(user_id, profile)
+            # Write through only if something worth storing changed
+            if self._is_dirty(user_id, profile):
+                with self._lock:
+                    exists = user_id in self._stored_snapshots
+                if await self._store_profile(user_id, profile, exists=exists):
+                    self._remember(user_id, profile)
             
             return profile
             
@@ -62,12 +84,62 @@ class UserProfileManager:
             print(f"Error updating user profile: {str(e)}")
             return self._create_default_profile(user_id)
     
+    async def _get_stored_profile(self, user_id: str) -> Optional[Dict]:
+        if self.async_db_manager is not None:
+            return await self.async_db_manager.get_user_profile(user_id)
+        return self.db_manager.get_user_profile(user_id)
+    
+    async def _store_profile(self, user_id: str, profile: Dict, exists: bool = False) -> bool:
+        if self.async_db_manager is not None:
+            return await self.async_db_manager.store_user_profile(user_id, profile, exists=exists)
+        return self.db_manager.store_user_profile(user_id, profile, exists=exists)
+    
+    @staticmethod
+    def _snapshot(profile: Dict) -> str:
+        """Serialized profile without last_interaction, which changes every turn"""
+        return json.dumps(
+            {key: value for key, value in profile.items() if key != "last_interaction"},
+            sort_keys=True,
+            default=str
+        )
+    
+    def _is_dirty(self, user_id: str, profile: Dict) -> bool:
+        """True if the profile differs from the stored copy (or its timestamp is stale)"""
+        with self._lock:
+            stored = self._stored_snapshots.get(user_id)
+        if stored is None or stored[0] != self._snapshot(profile):
+            return True
+        
+        # Only the timestamp moved: persist it occasionally rather than every turn
+        return (datetime.now() - stored[1]).total_seconds() >= self.touch_interval
+    
+    def _remember(self, user_id: str, profile: Dict, stored: bool = True):
+        """Cache a profile and, if it is in the database, record the stored state"""
+        snapshot = self._snapshot(profile)
+        with self._lock:
+            self._cache[user_id] = profile
+            self._cache.move_to_end(user_id)
+            if stored:
+                self._stored_snapshots[user_id] = (snapshot, datetime.now())
+            else:
+                self._stored_snapshots.pop(user_id, None)
+            while len(self._cache) > self.cache_size:
+                evicted, _ = self._cache.popitem(last=False)
+                self._stored_snapshots.pop(evicted, None)
+    
+    def invalidate(self, user_id: str):
+        """Drop a cached profile (e.g. after an out-of-band update)"""
+        with self._lock:
+            self._cache.pop(user_id, None)
+            self._stored_snapshots.pop(user_id, None)
+    
     def _create_default_profile(self, user_id: str) -> Dict:
         """Create default user profile"""
         return {
             "user_id": user_id,
             "summary": "",
             "key_topics": [],
+            "topic_bits": 0,
             "health_concerns": [],
             "preferences": {"language": "en"},
             "created_at": datetime.now().isoformat(),
@@ -76,16 +148,11 @@ class UserProfileManager:
     
     def _extract_topics(self, message: str, response: str) -> List[str]:
         """Extract key topics from message and response"""
-        # Simple keyword-based topic extraction
-        health_topics = [
-            "sleep", "stress", "anxiety", "diet", "exercise",
-            "nutrition", "supplements", "meditation", "wellness"
-        ]
-        
+        # Simple keyword-based topic extraction over the stored topic vocabulary
         found_topics = []
         combined_text = (message + " " + response).lower()
         
-        for topic in health_topics:
+        for topic in HEALTH_TOPICS:
             if topic in combined_text:
                 found_topics.append(topic)
         
@@ -118,6 +185,7 @@ user_profile = {
     "user_id": str,          # Unique identifier
     "summary": str,          # Interaction summary
     "key_topics": List[str], # Health topics discussed
+    "topic_bits": int,       # Bitset of key_topics over HEALTH_TOPICS
     "health_concerns": List[str], # Specific health issues
     "preferences": {         # User preferences
         "language": str      # Communication language
@@ -128,7 +196,8 @@ user_profile = {
 
 Methods:
 1. get_user_profile(user_id):
-   - Retrieves existing profile
+   - Serves from the in-process cache when possible
+   - Retrieves existing profile by id otherwise
    - Creates default if none exists
    - Handles database errors
 
@@ -136,7 +205,20 @@ Methods:
    - Updates interaction timestamp
    - Updates conversation summary
    - Extracts and updates topics
-   - Stores changes in database
+   - Writes through to the database only when the profile is dirty
+
+Storage Encoding:
+- Profiles are packed by database.profile_codec before storage:
+  key_topics as a bitset over HEALTH_TOPICS, everything else as a
+  versioned compressed JSON blob
+
+Caching:
+- Bounded LRU (cache_size) of profiles, write-through on update
+- Dirty-tracking compares against the last stored copy; a bare
+  last_interaction bump is persisted at most every touch_interval seconds
+- Updates are metadata-only, so the profile document is not re-embedded
+- Per-process cache: with several workers a profile may lag by one write
+- With an AsyncChromaDBManager, database reads/writes run off the event loop
 
 3. _create_default_profile(user_id):
    - Creates new profile structure